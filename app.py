@@ -3,11 +3,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from omegaconf import OmegaConf
-from src.data.make_dataset import make_dataset
-from src.features.build_features import build_features
-from src.models.train_model import train_model
-from src.models.predict_model import predict_model
-from src.visualization.visualize import visualize
+from src.data.series_ids import load_series_ids
+from src.models.forecast_store import (
+    forecasts_path,
+    latest_versions,
+    open_forecasts,
+    read_series_forecast,
+)
+from src.visualization.visualize import plot_forecast
 from pathlib import Path
 
 
@@ -25,34 +28,45 @@ def load_eda_data():
     )
 
 
-def run_forecast_flow(cfg, fh_selection, id_selection, show_actuals):
-    with st.spinner(
-        "Model is training and forecasts are being made, please wait..."
-    ):
-        make_dataset(cfg)
-        model_version = build_features(cfg, forecast_horizon=fh_selection)
-        train_model(
-            cfg, model_version=model_version, forecast_horizon=fh_selection
-        )
-        predict_model(
-            cfg, model_version=model_version, forecast_horizon=fh_selection
-        )
-        fig = visualize(
-            cfg,
-            id=id_selection,
-            model_version=model_version,
-            show_actuals=show_actuals,
-        )
-        st.markdown(
-            "<h3 style='text-align: center;'>Forecast Results</h3>",
-            unsafe_allow_html=True,
-        )
-        st.plotly_chart(fig)
+@st.cache_resource
+def load_forecast_store(path):
+    return open_forecasts(path)
+
+
+@st.cache_data
+def load_series_forecast(path, id):
+    return read_series_forecast(load_forecast_store(path), id)
+
+
+def run_forecast_flow(store_path, id_selection, show_actuals):
+    forecast_df = load_series_forecast(store_path, id_selection)
+    fig = plot_forecast(forecast_df, show_actuals=show_actuals)
+    st.markdown(
+        "<h3 style='text-align: center;'>Forecast Results</h3>",
+        unsafe_allow_html=True,
+    )
+    st.plotly_chart(fig)
 
 
 def render_forecast_tab(cfg):
-    fh_options = [28, 42, 60, 90]
-    id_options = list(range(1, 541))
+    latest = latest_versions(cfg)
+    if not latest:
+        st.error(
+            "No precomputed forecasts found, please run "
+            "`python3 -m scripts.precompute_forecasts` first."
+        )
+        return
+
+    # Warm the forecast store of every available horizon
+    store_paths = {
+        fh: str(forecasts_path(cfg, fh, model_version))
+        for fh, model_version in latest.items()
+    }
+    stores = {
+        fh: load_forecast_store(path) for fh, path in store_paths.items()
+    }
+    fh_options = sorted(stores)
+    series_ids = load_series_ids(cfg).set_index("id")
 
     # Create a container for the parameters
     params_container = st.container(border=True)
@@ -70,7 +84,14 @@ def render_forecast_tab(cfg):
 
         with col2:
             id_selection = st.selectbox(
-                "Select family-store pair ID:", id_options
+                "Select family-store pair ID:",
+                sorted(stores[fh_selection][1]),
+                format_func=lambda id: (
+                    f"{id}: store {series_ids.at[id, 'store_nbr']}, "
+                    f"{series_ids.at[id, 'family']}"
+                    if id in series_ids.index
+                    else str(id)
+                ),
             )
 
         # Toggle for showing actual values
@@ -84,10 +105,12 @@ def render_forecast_tab(cfg):
             )
 
     if st.button("Forecast"):
-        if not id_selection:
+        if id_selection is None:
             st.error("Please enter a valid ID.")
         else:
-            run_forecast_flow(cfg, fh_selection, id_selection, show_actuals)
+            run_forecast_flow(
+                store_paths[fh_selection], id_selection, show_actuals
+            )
 
 
 def render_eda_tab():
@@ -0,0 +1,68 @@
+import argparse
+import time
+import pandas as pd
+from omegaconf import OmegaConf
+from feature_engine.timeseries.forecasting import LagFeatures
+from benchmarks.synthetic import make_sales_frame
+from src.features.build_features import lag_features
+
+
+def groupby_lag_features(data, cfg, forecast_horizon):
+    """
+    The per-id feature_engine loop that `lag_features` replaced.
+    """
+    lags = [forecast_horizon + lag for lag in cfg.lags]
+    lag_it = LagFeatures(periods=lags, drop_original=True)
+    return pd.concat(
+        lag_it.fit_transform(group[["sales"]])
+        for _, group in data.groupby("id")
+    )
+
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark lag feature generation."
+    )
+    parser.add_argument(
+        "--series", type=int, nargs="+", default=[10, 60, 180, 540]
+    )
+    parser.add_argument("--days", type=int, default=1600)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--forecast-horizon", type=int, default=28)
+    args = parser.parse_args()
+
+    cfg = OmegaConf.load("config/config.yaml").build_features.lag_features
+
+    print(
+        f"{'series':>8} {'groupby (s)':>12} {'vectorized (s)':>15} "
+        f"{'speedup':>8}"
+    )
+    for n_series in args.series:
+        data = make_sales_frame(n_series, args.days)
+        legacy = best_of(
+            groupby_lag_features,
+            args.repeat,
+            data,
+            cfg,
+            args.forecast_horizon,
+        )
+        fast = best_of(
+            lag_features, args.repeat, data, cfg, args.forecast_horizon
+        )
+        print(
+            f"{n_series:>8} {legacy:>12.3f} {fast:>15.3f} "
+            f"{legacy / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Empty
+from omegaconf import OmegaConf
+from benchmarks.synthetic import write_raw_dataset
+from src.data.make_dataset import make_dataset
+from src.data.storage import load_table, table_path
+from src.features.build_features import (
+    build_features,
+    date_features,
+    lag_features,
+    statistical_features,
+    window_features,
+)
+from src.models.predict_model import predict_model
+from src.models.train_model import train_model
+from src.pipeline.instrumentation import peak_rss_mb
+
+
+def measure(stage, setup, run):
+    """
+    Runs a stage in a forked process, so its peak memory is not masked
+    by the stages before it. `setup` prepares the stage's inputs outside
+    of the measurement and `run` is timed.
+
+    Returns the wall time, the growth of the peak RSS over the RSS after
+    setup, and the stage's result.
+    """
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+
+    def target():
+        try:
+            inputs = setup()
+            base_rss = peak_rss_mb()
+            start = time.perf_counter()
+            result = run(inputs)
+            seconds = time.perf_counter() - start
+            queue.put((None, (seconds, peak_rss_mb() - base_rss, result)))
+        except BaseException as error:
+            queue.put((repr(error), None))
+            raise
+
+    process = context.Process(target=target)
+    process.start()
+
+    # Poll, so a child killed before reporting (e.g. by the OOM killer)
+    # fails the stage instead of blocking forever
+    while True:
+        alive = process.is_alive()
+        try:
+            error, measurement = queue.get(timeout=1)
+            break
+        except Empty:
+            if not alive:
+                error, measurement = f"exit code {process.exitcode}", None
+                break
+    process.join()
+    if error is not None:
+        raise RuntimeError(f"Stage {stage} failed: {error}")
+    seconds, peak_mb, result = measurement
+
+    return seconds, peak_mb, result
+
+
+def benchmark_scale(cfg, forecast_horizon: int) -> list:
+    """
+    Measures every stage on the dataset the config points to.
+    """
+    features_cfg = cfg.build_features
+    processed_path = table_path(
+        cfg.paths.processed_data_path, "train", cfg.paths.storage
+    )
+
+    def load_processed():
+        return load_table(processed_path)
+
+    def load_with_dates():
+        return date_features(load_processed(), features_cfg.date_features)
+
+    stages = [
+        ("make_dataset", lambda: None, lambda _: make_dataset(cfg)),
+        (
+            "date_features",
+            load_processed,
+            lambda data: date_features(data, features_cfg.date_features),
+        ),
+        (
+            "statistical_features",
+            load_with_dates,
+            lambda data: statistical_features(
+                data, features_cfg.statistical_features
+            ),
+        ),
+        (
+            "lag_features",
+            load_with_dates,
+            lambda data: lag_features(
+                data, features_cfg.lag_features, forecast_horizon
+            ),
+        ),
+        (
+            "window_features",
+            load_with_dates,
+            lambda data: window_features(
+                data, features_cfg.window_features, forecast_horizon
+            ),
+        ),
+        (
+            "build_features",
+            lambda: None,
+            lambda _: build_features(cfg, forecast_horizon=forecast_horizon),
+        ),
+    ]
+
+    results = []
+    model_version = None
+    for stage, setup, run in stages:
+        seconds, peak_mb, result = measure(stage, setup, run)
+        results.append(
+            {"stage": stage, "seconds": seconds, "peak_rss_mb": peak_mb}
+        )
+        if stage == "build_features":
+            model_version = result
+
+    for stage, run in [
+        ("train_model", train_model),
+        ("predict_model", predict_model),
+    ]:
+        seconds, peak_mb, _ = measure(
+            stage,
+            lambda: None,
+            lambda _: run(
+                cfg,
+                forecast_horizon=forecast_horizon,
+                model_version=model_version,
+            ),
+        )
+        results.append(
+            {"stage": stage, "seconds": seconds, "peak_rss_mb": peak_mb}
+        )
+
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """
+    Lists the stages that are more than `tolerance` times slower than in
+    the baseline run at the same scale.
+    """
+    baseline_seconds = {
+        (record["series"], record["days"], record["stage"]): record["seconds"]
+        for record in baseline
+    }
+
+    regressions = []
+    for record in results:
+        key = (record["series"], record["days"], record["stage"])
+        if key in baseline_seconds:
+            ratio = record["seconds"] / baseline_seconds[key]
+            if ratio > tolerance:
+                regressions.append((key, ratio))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every pipeline stage on synthetic data."
+    )
+    parser.add_argument("--stores", type=int, nargs="+", default=[6, 18, 54])
+    parser.add_argument("--families", type=int, default=10)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--forecast-horizon", type=int, default=28)
+    parser.add_argument("--output", default="benchmarks/results/pipeline.json")
+    parser.add_argument(
+        "--baseline", default=None, help="results file to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="slowdown over the baseline reported as a regression",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for n_stores in args.stores:
+        with tempfile.TemporaryDirectory() as root:
+            root = Path(root)
+            write_raw_dataset(root, n_stores, args.families, args.days)
+
+            cfg = OmegaConf.load("config/config.yaml")
+            cfg.paths.input_data_path = str(root / "raw")
+            cfg.paths.external_data_path = str(root / "external")
+            cfg.paths.processed_data_path = str(root / "processed")
+            cfg.paths.interim_data_path = str(root / "interim")
+            cfg.paths.model_save_path = str(root / "models")
+            for path in ["processed", "interim", "models"]:
+                (root / path).mkdir()
+
+            for record in benchmark_scale(cfg, args.forecast_horizon):
+                record = {
+                    "series": n_stores * args.families,
+                    "days": args.days,
+                    **record,
+                }
+                results.append(record)
+                print(
+                    f"{record['series']:>6} series {record['stage']:>21} "
+                    f"{record['seconds']:>9.3f} s "
+                    f"{record['peak_rss_mb']:>9.1f} MB"
+                )
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "forecast_horizon": args.forecast_horizon,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for (series, days, stage), ratio in regressions:
+            print(
+                f"Regression: {stage} at {series} series x {days} days "
+                f"is {ratio:.2f}x slower than the baseline"
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
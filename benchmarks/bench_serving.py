@@ -0,0 +1,57 @@
+import argparse
+import json
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+
+def timed_request(url):
+    start = time.perf_counter()
+    try:
+        with urlopen(url) as response:
+            json.load(response)
+    except HTTPError as error:
+        raise SystemExit(f"{url}: {error.code} {error.read().decode()}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test the forecast serving API."
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--ids", type=int, nargs="+", default=list(range(10)))
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--horizon", type=int, default=28)
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    version = f"&version={args.version}" if args.version else ""
+    urls = [
+        f"{args.url}/forecast?horizon={args.horizon}{version}&ids="
+        + ",".join(map(str, rng.choice(args.ids, args.batch)))
+        for _ in range(args.requests)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = np.array(list(executor.map(timed_request, urls)))
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    print(
+        f"{args.requests} requests of {args.batch} ids with "
+        f"{args.concurrency} clients in {elapsed:.2f} s "
+        f"({args.requests / elapsed:.0f} req/s)"
+    )
+    print(f"p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+from darts import TimeSeries
+from benchmarks.synthetic import make_feature_frame
+from src.models.series_builder import build_series_groups
+
+STATIC_COLS = ["city", "state", "type", "cluster"]
+
+
+def group_dataframe_series(data, value_cols, cutoff_date):
+    """
+    The four `TimeSeries.from_group_dataframe` calls that
+    `build_series_groups` replaced.
+    """
+    groups = {}
+    for name, cols in value_cols.items():
+        groups[name] = tuple(
+            TimeSeries.from_group_dataframe(
+                split,
+                group_cols="id",
+                time_col="date",
+                static_cols=STATIC_COLS,
+                value_cols=cols,
+                fill_missing_dates=True,
+                freq="D",
+                fillna_value=0,
+            )
+            for split in [
+                data[data["date"] <= cutoff_date].copy(),
+                data[data["date"] > cutoff_date].copy(),
+            ]
+        )
+    return groups
+
+
+def measure(func, *args):
+    """
+    Returns the wall time and the peak traced memory of one call.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark building the training TimeSeries lists."
+    )
+    parser.add_argument("--stores", type=int, nargs="+", default=[6, 18, 54])
+    parser.add_argument("--families", type=int, default=33)
+    parser.add_argument("--days", type=int, default=1600)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--forecast-horizon", type=int, default=28)
+    args = parser.parse_args()
+
+    print(
+        f"{'series':>8} {'groupby (s)':>12} {'peak (MB)':>10} "
+        f"{'single pass (s)':>16} {'peak (MB)':>10} {'speedup':>8}"
+    )
+    for n_stores in args.stores:
+        data = make_feature_frame(
+            n_stores, args.families, args.days, args.features
+        )
+        value_cols = {
+            "y": ["sales"],
+            "future_cov": [f"feature_{i}" for i in range(args.features)],
+        }
+        cutoff_date = data["date"].max() - pd.Timedelta(
+            args.forecast_horizon, unit="D"
+        )
+
+        legacy, legacy_peak = measure(
+            group_dataframe_series, data, value_cols, cutoff_date
+        )
+        fast, fast_peak = measure(
+            build_series_groups, data, value_cols, STATIC_COLS, cutoff_date
+        )
+        print(
+            f"{n_stores * args.families:>8} {legacy:>12.3f} "
+            f"{legacy_peak:>10.1f} {fast:>16.3f} {fast_peak:>10.1f} "
+            f"{legacy / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+def make_sales_frame(
+    n_series: int, n_days: int, start: str = "2013-01-01", seed: int = 0
+) -> pd.DataFrame:
+    """
+    Generates a date-major sales frame with the `id`, `date` and `sales`
+    columns that the feature functions consume.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=n_days, freq="D")
+
+    data = pd.DataFrame(
+        {
+            "id": np.tile(np.arange(n_series), n_days),
+            "date": np.repeat(dates, n_series),
+            "sales": rng.gamma(2.0, 50.0, n_series * n_days).astype(
+                np.float32
+            ),
+        }
+    )
+
+    return data
+
+
+def make_feature_frame(
+    n_stores: int,
+    n_families: int,
+    n_days: int,
+    n_features: int = 8,
+    start: str = "2013-01-01",
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Generates a feature frame shaped like the build_features output: one
+    series per store and family with the target, numeric future
+    covariates and the static store attributes.
+    """
+    n_series = n_stores * n_families
+    data = make_sales_frame(n_series, n_days, start=start, seed=seed)
+    rng = np.random.default_rng(seed)
+
+    store = data["id"].to_numpy() // n_families
+    data["city"] = (store % 22).astype(np.int16)
+    data["state"] = (store % 16).astype(np.int16)
+    data["type"] = (store % 5).astype(np.int16)
+    data["cluster"] = (store % 17).astype(np.int16)
+    for i in range(n_features):
+        data[f"feature_{i}"] = rng.normal(size=len(data)).astype(np.float32)
+
+    return data
+
+
+# The families of train.csv, the ones kept by the default config first
+FAMILIES = [
+    "GROCERY I",
+    "BEVERAGES",
+    "PRODUCE",
+    "CLEANING",
+    "DAIRY",
+    "BREAD/BAKERY",
+    "POULTRY",
+    "MEATS",
+    "PERSONAL CARE",
+    "DELI",
+    "AUTOMOTIVE",
+    "BABY CARE",
+    "BEAUTY",
+    "BOOKS",
+    "CELEBRATION",
+    "EGGS",
+    "FROZEN FOODS",
+    "GROCERY II",
+    "HARDWARE",
+    "HOME AND KITCHEN I",
+    "HOME AND KITCHEN II",
+    "HOME APPLIANCES",
+    "HOME CARE",
+    "LADIESWEAR",
+    "LAWN AND GARDEN",
+    "LINGERIE",
+    "LIQUOR,WINE,BEER",
+    "MAGAZINES",
+    "PET SUPPLIES",
+    "PLAYERS AND ELECTRONICS",
+    "PREPARED FOODS",
+    "SCHOOL AND OFFICE SUPPLIES",
+    "SEAFOOD",
+]
+
+
+def write_raw_dataset(
+    root: Path,
+    n_stores: int,
+    n_families: int,
+    n_days: int,
+    end: str = "2017-08-15",
+    seed: int = 0,
+):
+    """
+    Writes a synthetic dataset in the schema of the raw inputs:
+    `raw/train.csv` ordered by date, `raw/stores.csv`,
+    `raw/transactions.csv`, `external/oil.csv` with the weekend gaps of
+    the real oil prices and `external/holidays_events.csv` with a
+    national, regional and local holiday every month.
+    """
+    root = Path(root)
+    (root / "raw").mkdir(parents=True, exist_ok=True)
+    (root / "external").mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=end, periods=n_days, freq="D")
+    stores = np.arange(1, n_stores + 1)
+    families = FAMILIES[:n_families]
+
+    n_series = n_stores * n_families
+    sales = pd.DataFrame(
+        {
+            "date": np.repeat(dates.strftime("%Y-%m-%d"), n_series),
+            "store_nbr": np.tile(np.repeat(stores, n_families), n_days),
+            "family": np.tile(families, n_stores * n_days),
+            "sales": rng.gamma(2.0, 50.0, n_series * n_days).round(3),
+            "onpromotion": rng.poisson(2.0, n_series * n_days),
+        }
+    )
+    sales.insert(0, "id", np.arange(len(sales)))
+    sales.to_csv(root / "raw" / "train.csv", index=False)
+
+    pd.DataFrame(
+        {
+            "store_nbr": stores,
+            "city": [f"City {store % 22}" for store in stores],
+            "state": [f"State {store % 16}" for store in stores],
+            "type": ["ABCDE"[store % 5] for store in stores],
+            "cluster": stores % 17 + 1,
+        }
+    ).to_csv(root / "raw" / "stores.csv", index=False)
+
+    oil = pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "dcoilwtico": 50 + rng.normal(0, 1, n_days).cumsum().round(2),
+        }
+    )
+    oil.loc[dates.dayofweek >= 5, "dcoilwtico"] = np.nan
+    oil.to_csv(root / "external" / "oil.csv", index=False)
+
+    pd.DataFrame(
+        {
+            "date": np.repeat(dates.strftime("%Y-%m-%d"), n_stores),
+            "store_nbr": np.tile(stores, n_days),
+            "transactions": rng.poisson(1500, n_stores * n_days),
+        }
+    ).to_csv(root / "raw" / "transactions.csv", index=False)
+
+    month_starts = dates[dates.day == 1]
+    holidays = pd.DataFrame(
+        {
+            "date": np.concatenate(
+                [
+                    (month_starts + pd.Timedelta(days=day)).strftime(
+                        "%Y-%m-%d"
+                    )
+                    for day in [0, 9, 19]
+                ]
+            ),
+            "type": "Holiday",
+            "locale": np.repeat(
+                ["National", "Regional", "Local"], len(month_starts)
+            ),
+            "locale_name": np.repeat(
+                ["Ecuador", "State 1", "City 1"], len(month_starts)
+            ),
+            "description": "Holiday",
+            "transferred": False,
+        }
+    )
+    holidays.sort_values("date").to_csv(
+        root / "external" / "holidays_events.csv", index=False
+    )
@@ -0,0 +1,34 @@
+import hydra
+from omegaconf import DictConfig
+from src.models.forecast_store import save_forecasts
+from src.pipeline.pipeline import run_pipeline
+
+
+@hydra.main(config_path="../config/config.yaml")
+def precompute_forecasts(cfg: DictConfig):
+
+    horizons = list(cfg.forecast_store.horizons)
+
+    if cfg.forecast_store.multi_horizon:
+        # One pipeline run with the offsets of the largest horizon; every
+        # shorter horizon is a prefix of its forecasts
+        model_version = run_pipeline(cfg, forecast_horizon=max(horizons))
+        for forecast_horizon in horizons:
+            save_forecasts(
+                cfg,
+                forecast_horizon=forecast_horizon,
+                model_version=model_version,
+            )
+        return
+
+    # Run the pipeline for every horizon offered by the app and store the
+    # forecasts it serves
+    for forecast_horizon in horizons:
+        model_version = run_pipeline(cfg, forecast_horizon=forecast_horizon)
+        save_forecasts(
+            cfg, forecast_horizon=forecast_horizon, model_version=model_version
+        )
+
+
+if __name__ == "__main__":
+    precompute_forecasts()
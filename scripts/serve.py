@@ -0,0 +1,14 @@
+import hydra
+from omegaconf import DictConfig
+from src.serving.server import serve
+
+
+@hydra.main(config_path="../config/config.yaml")
+def run_server(cfg: DictConfig):
+
+    # Answer forecast requests until interrupted
+    serve(cfg)
+
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,15 @@
+import hydra
+from omegaconf import DictConfig
+from src.models.tuning import tune
+
+
+@hydra.main(config_path="../config/config.yaml")
+def run_tuning(cfg: DictConfig):
+
+    # Build the union of the candidates' features, skipping cached
+    # stages, and backtest every candidate on it
+    tune(cfg, forecast_horizon=cfg.train.forecast_horizon)
+
+
+if __name__ == "__main__":
+    run_tuning()
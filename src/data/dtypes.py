@@ -0,0 +1,86 @@
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+SIGNED_TYPES = [np.int8, np.int16, np.int32, np.int64]
+UNSIGNED_TYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+def compact_dtypes(
+    data: pd.DataFrame, cfg: DictConfig, integers: bool = True
+) -> pd.DataFrame:
+    """
+    Downcasts the columns of the frame in place according to the dtype
+    policy: float64 to float32, integers to the narrowest type holding
+    their values (keeping their signedness) and repetitive object
+    columns to categories.
+
+    Integer widths depend on the values, so pass `integers=False` for
+    frames that are only part of a table.
+
+    Returns the per-column memory report.
+    """
+    before = data.memory_usage(index=False, deep=True)
+    dtypes_before = data.dtypes.astype(str)
+
+    for col in data.columns:
+        values = data[col]
+        if cfg.float32 and values.dtype == np.float64:
+            data[col] = values.astype(np.float32)
+        elif (
+            integers
+            and cfg.downcast_integers
+            and values.dtype.kind in "iu"
+            and len(values)
+        ):
+            data[col] = values.astype(
+                _narrowest_integer(values.min(), values.max(), values.dtype)
+            )
+        elif (
+            values.dtype == object
+            and len(values)
+            and values.nunique() <= cfg.category_max_ratio * len(values)
+        ):
+            data[col] = values.astype("category")
+
+    after = data.memory_usage(index=False, deep=True)
+    report = pd.DataFrame(
+        {
+            "dtype_before": dtypes_before,
+            "dtype_after": data.dtypes.astype(str),
+            "mb_before": before / 2**20,
+            "mb_after": after / 2**20,
+        }
+    ).rename_axis("column")
+    report["mb_saved"] = report["mb_before"] - report["mb_after"]
+
+    return report
+
+
+def save_memory_report(report: pd.DataFrame, path: Path):
+    """
+    Writes the per-column memory report and logs the total savings.
+    """
+    report.round(3).to_csv(path)
+    logger.info(
+        f"Compacted dtypes from {report['mb_before'].sum():.1f} MB to "
+        f"{report['mb_after'].sum():.1f} MB, report saved to {path}"
+    )
+
+
+def _narrowest_integer(low, high, dtype: np.dtype):
+    """
+    Returns the narrowest integer type of the same signedness as `dtype`
+    holding every value between `low` and `high`.
+    """
+    types = UNSIGNED_TYPES if dtype.kind == "u" else SIGNED_TYPES
+    for candidate in types:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+
+    return dtype
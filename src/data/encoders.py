@@ -0,0 +1,68 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+def encoders_path(directory: Path) -> Path:
+    """
+    Returns the path of the encoder registry saved in a directory.
+    """
+    return Path(directory) / "encoders.json"
+
+
+def load_encoders(path: Path) -> dict:
+    """
+    Loads the vocabulary of every encoded column, empty if none was saved.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_encoders(encoders: dict, path: Path):
+    """
+    Saves the vocabulary of every encoded column.
+    """
+    with open(path, "w") as file:
+        json.dump(encoders, file, indent=2)
+
+
+def encode_column(values: pd.Series, vocabulary: list):
+    """
+    Encodes values as their position in the vocabulary. Unseen values are
+    appended to the vocabulary in sorted order, so existing codes never
+    change.
+
+    Returns the codes and the updated vocabulary.
+    """
+    # Map only the distinct values, then broadcast back to the rows
+    row_codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques.astype(str))
+
+    unseen = uniques.difference(vocabulary, sort=False)
+    if len(unseen):
+        vocabulary = list(vocabulary) + sorted(unseen)
+
+    unique_codes = pd.Index(vocabulary).get_indexer(uniques)
+    codes = np.where(row_codes >= 0, unique_codes[row_codes], -1)
+
+    return codes.astype(np.int64), vocabulary
+
+
+def encode_columns(data: pd.DataFrame, cols: list, encoders: dict):
+    """
+    Encodes the given columns in place through the encoder registry.
+
+    Returns the updated registry.
+    """
+    encoders = dict(encoders)
+    for col in cols:
+        data[col], encoders[col] = encode_column(
+            data[col], encoders.get(col, [])
+        )
+
+    return encoders
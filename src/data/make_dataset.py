@@ -1,45 +1,76 @@
+import hashlib
+import io
+import json
 import logging
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from omegaconf import DictConfig
-from sklearn.preprocessing import LabelEncoder
+from omegaconf import DictConfig, OmegaConf
+from src.data.dtypes import compact_dtypes, save_memory_report
+from src.data.encoders import (
+    encode_columns,
+    encoders_path,
+    load_encoders,
+    save_encoders,
+)
+from src.data.storage import (
+    concat_tables,
+    load_table,
+    save_table,
+    table_path,
+)
+from src.data.store_calendar import (
+    join_store_calendar,
+    read_holidays,
+    read_transactions,
+    store_calendar,
+)
+from src.data.series_ids import (
+    assign_series_ids,
+    load_series_ids,
+    series_ids_path,
+)
+from src.pipeline.instrumentation import step
 
 logger = logging.getLogger(__name__)
 
+SALES_COLUMNS = ["store_nbr", "family", "date", "sales", "onpromotion"]
+SALES_DTYPES = {
+    "store_nbr": "category",
+    "family": "category",
+    "sales": "float32",
+    "onpromotion": "uint32",
+}
 
-def make_dataset(cfg: DictConfig):
+
+def read_sales(raw_data_path: Path, offset: int = 0):
     """
-    Processes raw and external datasets according to specified configurations.
+    Reads the raw sales rows stored after the given byte offset of the
+    date-ordered train.csv, returning them with the new end offset.
     """
-    logger.info("Making final data set from raw data")
+    with open(raw_data_path, "rb") as file:
+        header = file.readline()
+        end_offset = file.seek(0, io.SEEK_END)
+        file.seek(max(offset, len(header)))
+        content = header + file.read(end_offset - file.tell())
 
-    # Construct paths to the input and output directories
-    input_dir = Path(cfg.paths.input_data_path)
-    output_dir = Path(cfg.paths.processed_data_path)
-    external_dir = Path(cfg.paths.external_data_path)
-
-    # Make paths
-    raw_data_path = input_dir / "train.csv"
-    stores_path = input_dir / "stores.csv"
-    oil_path = external_dir / "oil.csv"
-    output_path = output_dir / "train.csv"
-
-    # Read the datasets
     raw_df = pd.read_csv(
-        raw_data_path,
-        usecols=["store_nbr", "family", "date", "sales", "onpromotion"],
-        dtype={
-            "store_nbr": "category",
-            "family": "category",
-            "sales": "float32",
-            "onpromotion": "uint32",
-        },
+        io.BytesIO(content),
+        usecols=SALES_COLUMNS,
+        dtype=SALES_DTYPES,
         parse_dates=["date"],
-        infer_datetime_format=True,
     )
-    raw_df["date"] = raw_df.date.dt.to_period("D")
+    # An empty read leaves the date column unparsed
+    raw_df["date"] = pd.to_datetime(raw_df["date"]).dt.to_period("D")
+
+    return raw_df, end_offset
 
-    stores_df = pd.read_csv(
+
+def read_stores(stores_path: Path) -> pd.DataFrame:
+    """
+    Reads the store metadata.
+    """
+    return pd.read_csv(
         stores_path,
         dtype={
             "store_nbr": "category",
@@ -50,29 +81,64 @@ def make_dataset(cfg: DictConfig):
         },
     )
 
+
+def read_oil(oil_path: Path, fillna_method: str) -> pd.DataFrame:
+    """
+    Reads the daily oil prices and fills the gaps.
+    """
     oil_df = pd.read_csv(
         oil_path,
         dtype={
             "dcoilwtico": "float32",
         },
         parse_dates=["date"],
-        infer_datetime_format=True,
     )
     oil_df["date"] = oil_df.date.dt.to_period("D")
+    oil_df["dcoilwtico"] = _fill_gaps(oil_df["dcoilwtico"], fillna_method)
+
+    return oil_df
+
+
+def _fill_gaps(values: pd.Series, fillna_method: str) -> pd.Series:
+    """
+    Fills missing values backward or forward, as named by `fillna_method`.
+    """
+    if fillna_method in ("backfill", "bfill"):
+        return values.bfill()
+    if fillna_method in ("pad", "ffill"):
+        return values.ffill()
+    raise ValueError(f"Unknown fillna method: {fillna_method}")
+
 
-    # Process the datasets
-    oil_df.fillna(method=cfg.make_dataset.fillna_method, inplace=True)
-    filtered_df = raw_df[raw_df["family"].isin(cfg.make_dataset.filter_family)]
+def process_sales(
+    raw_df: pd.DataFrame,
+    stores_df: pd.DataFrame,
+    oil_df: pd.DataFrame,
+    series_ids: pd.DataFrame,
+    cfg: DictConfig,
+    calendar: dict = None,
+):
+    """
+    Filters, merges and cleans raw sales rows, joins the (date, store)
+    calendar covariates if given and assigns the integer identifier of
+    every time series.
+
+    Returns the processed rows and the updated id mapping table.
+    """
+    if cfg.filter_family:
+        filtered_df = raw_df[raw_df["family"].isin(cfg.filter_family)]
+    else:
+        filtered_df = raw_df
 
     # Construct the final dataset
     final_df = filtered_df.merge(stores_df, on="store_nbr", how="left")
     final_df = final_df.merge(oil_df, on="date", how="left")
-    final_df["dcoilwtico"] = final_df["dcoilwtico"].fillna(
-        method=cfg.make_dataset.fillna_method
+    final_df["dcoilwtico"] = _fill_gaps(
+        final_df["dcoilwtico"], cfg.fillna_method
     )
 
     # Apply data cleaning based on configuration
-    for rule in cfg.make_dataset.remove_unusual_data:
+    for rule in cfg.remove_unusual_data:
         families = rule.family
         before_date = rule.before_date
         condition = (final_df["family"].isin(families)) & (
@@ -80,18 +146,213 @@ def make_dataset(cfg: DictConfig):
         )
         final_df = final_df[~(condition)]
 
+    if calendar is not None:
+        final_df = join_store_calendar(final_df, calendar)
+
     # Create the unique identifier for time series
-    group_by = cfg.make_dataset.group_by
-    final_df["id"] = final_df[group_by].apply(
-        lambda row: "_".join(row.values.astype(str)), axis=1
+    final_df["id"], series_ids = assign_series_ids(
+        final_df, list(cfg.group_by), series_ids
     )
 
-    # Encode categorical columns
-    label_encoder = LabelEncoder()
-    for col in cfg.make_dataset.categorical_cols:
-        final_df[col] = label_encoder.fit_transform(final_df[col])
+    return final_df, series_ids
+
 
-    # Save the processed dataframe
-    final_df.to_csv(output_path, index=False)
+def make_dataset(cfg: DictConfig):
+    """
+    Processes raw and external datasets according to specified configurations.
+    """
+    logger.info("Making final data set from raw data")
+
+    # Construct paths to the input and output directories
+    input_dir = Path(cfg.paths.input_data_path)
+    output_dir = Path(cfg.paths.processed_data_path)
+    external_dir = Path(cfg.paths.external_data_path)
+
+    # Make paths
+    raw_data_path = input_dir / "train.csv"
+    stores_path = input_dir / "stores.csv"
+    oil_path = external_dir / "oil.csv"
+    holidays_path = external_dir / "holidays_events.csv"
+    transactions_path = input_dir / "transactions.csv"
+    output_path = table_path(output_dir, "train", cfg.paths.storage)
+    state_path = output_dir / "ingestion_state.json"
+
+    # Any change to the processing config, the store metadata or the
+    # holidays invalidates the processed store
+    make_dataset_cfg = OmegaConf.to_container(cfg.make_dataset, resolve=True)
+    make_dataset_cfg.pop("incremental", None)
+    dtypes_cfg = OmegaConf.to_container(cfg.dtypes, resolve=True)
+    state = {
+        "config": _fingerprint(
+            json.dumps(
+                [make_dataset_cfg, dtypes_cfg, output_path.name]
+            ).encode()
+        ),
+        "stores": _fingerprint(stores_path.read_bytes()),
+    }
+    if cfg.make_dataset.store_calendar.holidays:
+        state["holidays"] = _fingerprint(holidays_path.read_bytes())
+    previous_state = _load_state(state_path, raw_data_path, output_path)
+
+    # Read the datasets
+    stores_df = read_stores(stores_path)
+    oil_df = read_oil(oil_path, cfg.make_dataset.fillna_method)
+    series_ids = load_series_ids(cfg)
+    calendar_cfg = cfg.make_dataset.store_calendar
+    holidays_df = (
+        read_holidays(holidays_path) if calendar_cfg.holidays else None
+    )
+    transactions_df = (
+        read_transactions(transactions_path)
+        if calendar_cfg.transactions
+        else None
+    )
+
+    with step("read_and_process") as measurement:
+        if (
+            cfg.make_dataset.incremental
+            and previous_state is not None
+            and previous_state["config"] == state["config"]
+            and previous_state["stores"] == state["stores"]
+            and previous_state.get("holidays") == state.get("holidays")
+        ):
+            # Process only the sales rows appended since the last run
+            raw_df, sales_offset = read_sales(
+                raw_data_path, previous_state["sales_offset"]
+            )
+            raw_df = raw_df[raw_df["date"] > previous_state["sales_date"]]
+            if raw_df.empty:
+                logger.info(
+                    f"No new sales after {previous_state['sales_date']}"
+                )
+                return
+        else:
+            previous_state = None
+            raw_df, sales_offset = read_sales(raw_data_path)
+
+        # Covariates of every (date, store) pair of the new sales rows
+        calendar = None
+        if holidays_df is not None or transactions_df is not None:
+            calendar = store_calendar(
+                stores_df,
+                raw_df["date"].min(),
+                raw_df["date"].max(),
+                holidays_df,
+                transactions_df,
+            )
+        final_df, series_ids = process_sales(
+            raw_df, stores_df, oil_df, series_ids, cfg.make_dataset, calendar
+        )
+        measurement["rows_in"] = len(raw_df)
+        measurement["rows_out"] = len(final_df)
+
+    state["sales_offset"] = sales_offset
+    state["sales_date"] = str(raw_df["date"].max())
+    state["oil_date"] = str(oil_df["date"].max())
+
+    # Encode categorical columns through the persisted encoder registry,
+    # so codes stay the same across runs
+    with step("encode"):
+        encoders = encode_columns(
+            final_df,
+            list(cfg.make_dataset.categorical_cols),
+            load_encoders(encoders_path(output_dir)),
+        )
+
+    # Save the processed dataframe with timestamps for the date column
+    with step("save") as measurement:
+        final_df["date"] = final_df["date"].dt.to_timestamp()
+        # Integer widths depend on the values, so appended rows are only
+        # narrowed together with the stored table
+        if cfg.dtypes.enabled:
+            report = compact_dtypes(
+                final_df, cfg.dtypes, integers=previous_state is None
+            )
+        if previous_state is not None:
+            logger.info(
+                f"Appending {len(final_df)} rows after "
+                f"{previous_state['sales_date']}"
+            )
+            final_df = _append_sales(
+                load_table(output_path),
+                final_df,
+                oil_df,
+                previous_state["oil_date"],
+                cfg.make_dataset,
+            )
+            if cfg.dtypes.enabled:
+                report = compact_dtypes(final_df, cfg.dtypes)
+        if cfg.dtypes.enabled:
+            save_memory_report(report, output_dir / "memory_report.csv")
+        save_table(final_df, output_path, cfg.paths.storage)
+        save_table(series_ids, series_ids_path(cfg), cfg.paths.storage)
+        save_encoders(encoders, encoders_path(output_dir))
+        measurement["rows_out"] = len(final_df)
+
+    with open(state_path, "w") as file:
+        json.dump(state, file, indent=2)
 
     logger.info(f"Dataset saved to {output_path}")
+
+
+def _append_sales(
+    processed_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    oil_df: pd.DataFrame,
+    oil_date: str,
+    cfg: DictConfig,
+) -> pd.DataFrame:
+    """
+    Appends the newly processed rows. The oil prices of the processed
+    rows after the last run's oil high-water mark are merged again from
+    the current oil prices, and the missing ones are backfilled across
+    the boundary.
+    """
+    # Start of the rows whose oil prices may have changed: those after
+    # the oil high-water mark, or the trailing run of missing prices
+    missing = processed_df["dcoilwtico"].isna().to_numpy()
+    trailing = len(missing) if missing.all() else np.argmin(missing[::-1])
+    after = processed_df["date"] > pd.Timestamp(oil_date)
+    boundary = min(
+        len(processed_df) - trailing,
+        np.argmax(after) if after.any() else len(processed_df),
+    )
+
+    final_df = concat_tables([processed_df, new_df])
+    oil_prices = oil_df.set_index(oil_df["date"].dt.to_timestamp())[
+        "dcoilwtico"
+    ]
+    dates = final_df.loc[boundary:, "date"]
+    final_df.loc[boundary:, "dcoilwtico"] = _fill_gaps(
+        dates.map(oil_prices).astype(final_df["dcoilwtico"].dtype),
+        cfg.fillna_method,
+    )
+
+    return final_df
+
+
+def _load_state(state_path: Path, raw_data_path: Path, output_path: Path):
+    """
+    Loads the high-water marks of the last run, if they still describe
+    the files on disk.
+    """
+    if not state_path.exists() or not output_path.exists():
+        return None
+
+    with open(state_path) as file:
+        state = json.load(file)
+
+    # The raw sales file must have only grown, by whole lines
+    offset = state["sales_offset"]
+    with open(raw_data_path, "rb") as file:
+        if file.seek(0, io.SEEK_END) < offset:
+            return None
+        file.seek(offset - 1)
+        if file.read(1) != b"\n":
+            return None
+
+    return state
+
+
+def _fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
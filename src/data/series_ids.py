@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from omegaconf import DictConfig
+from src.data.storage import load_table, table_path
+
+
+def series_ids_path(cfg: DictConfig) -> Path:
+    """
+    Returns the path of the persisted id <-> group_by mapping table.
+    """
+    return table_path(
+        cfg.paths.processed_data_path, "series_ids", cfg.paths.storage
+    )
+
+
+def load_series_ids(cfg: DictConfig) -> pd.DataFrame:
+    """
+    Loads the id <-> group_by mapping table, empty if none was saved yet.
+    """
+    path = series_ids_path(cfg)
+    if not path.exists():
+        return pd.DataFrame(
+            {
+                "id": pd.Series(dtype="int64"),
+                **{
+                    col: pd.Series(dtype="object")
+                    for col in cfg.make_dataset.group_by
+                },
+            }
+        )
+
+    return load_table(path)
+
+
+def assign_series_ids(
+    data: pd.DataFrame, group_by: list, series_ids: pd.DataFrame
+):
+    """
+    Builds the integer series id of every row from the categorical codes
+    of the group_by columns. Known combinations keep the id recorded in
+    the mapping table, new ones get appended ids.
+
+    Returns the ids and the updated mapping table.
+    """
+    # Combine the per-column codes into one mixed-radix integer key
+    key = np.zeros(len(data), dtype=np.int64)
+    col_uniques = []
+    for col in group_by:
+        codes, uniques = pd.factorize(data[col], sort=True)
+        key = key * len(uniques) + codes
+        col_uniques.append(uniques)
+
+    unique_keys, inverse = np.unique(key, return_inverse=True)
+
+    # Decode every distinct key back into its group_by values
+    keys_df = {}
+    remainder = unique_keys
+    for col, uniques in zip(group_by[::-1], col_uniques[::-1]):
+        remainder, codes = np.divmod(remainder, len(uniques))
+        keys_df[col] = np.asarray(uniques.astype(str))[codes]
+    keys_df = pd.DataFrame({col: keys_df[col] for col in group_by})
+
+    # Look up known combinations and append ids for the new ones
+    keys_df = keys_df.merge(series_ids, on=group_by, how="left")
+    is_new = keys_df["id"].isna().to_numpy()
+    next_id = series_ids["id"].max() + 1 if len(series_ids) else 0
+    keys_df.loc[is_new, "id"] = np.arange(next_id, next_id + is_new.sum())
+    keys_df["id"] = keys_df["id"].astype("int64")
+
+    series_ids = pd.concat(
+        [series_ids, keys_df.loc[is_new, ["id"] + list(group_by)]],
+        ignore_index=True,
+    )
+
+    return keys_df["id"].to_numpy()[inverse], series_ids
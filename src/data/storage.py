@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from omegaconf import DictConfig
+from pandas.api.types import union_categoricals
+
+STORAGE_FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+
+def table_path(directory: Path, name: str, cfg: DictConfig) -> Path:
+    """
+    Returns the path of a named table in the configured storage format.
+    """
+    if cfg.format not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format: {cfg.format}")
+
+    return Path(directory) / f"{name}{STORAGE_FORMATS[cfg.format]}"
+
+
+def save_table(data: pd.DataFrame, path: Path, cfg: DictConfig):
+    """
+    Writes the DataFrame as a compressed columnar file, keeping the
+    category, float32 and unsigned integer dtypes intact.
+    """
+    path = Path(path)
+    data = data.reset_index(drop=True)
+
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        data.to_parquet(path, index=False, compression=cfg.compression)
+    elif path.suffix == STORAGE_FORMATS["feather"]:
+        data.to_feather(path, compression=cfg.compression)
+    else:
+        raise ValueError(f"Unknown storage format for {path}")
+
+
+def load_table(path: Path, columns: list = None) -> pd.DataFrame:
+    """
+    Reads a columnar file, loading only the requested columns if given.
+    """
+    path = Path(path)
+
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        return pd.read_parquet(path, columns=columns)
+    if path.suffix == STORAGE_FORMATS["feather"]:
+        return pd.read_feather(path, columns=columns)
+    raise ValueError(f"Unknown storage format for {path}")
+
+
+def load_table_rows(
+    path: Path, column: str, values, columns: list = None
+) -> pd.DataFrame:
+    """
+    Reads only the rows whose `column` is in `values`, filtering while
+    scanning so the rest of the file is never materialised.
+    """
+    path = Path(path)
+
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        dataset = ds.dataset(path, format="parquet")
+    elif path.suffix == STORAGE_FORMATS["feather"]:
+        dataset = ds.dataset(path, format="feather")
+    else:
+        raise ValueError(f"Unknown storage format for {path}")
+
+    table = dataset.to_table(
+        columns=columns, filter=ds.field(column).isin(list(values))
+    )
+    return table.to_pandas()
+
+
+def split_table_rows(
+    path: Path, column: str, labels: pd.Series, directory: Path, cfg
+) -> dict:
+    """
+    Splits a file in one pass over its batches into one file per label,
+    where `labels` maps the values of `column` to integer labels. Rows
+    whose value has no label are dropped; every output keeps the input
+    row order.
+
+    Returns the path of every label's file.
+    """
+    path = Path(path)
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        batches = pq.ParquetFile(path).iter_batches()
+    elif path.suffix == STORAGE_FORMATS["feather"]:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        batches = (
+            reader.get_batch(i) for i in range(reader.num_record_batches)
+        )
+    else:
+        raise ValueError(f"Unknown storage format for {path}")
+
+    # Dense lookup of the label of every value, -1 for unlabelled ones
+    lookup = np.full(int(labels.index.max()) + 1, -1, dtype=np.int64)
+    lookup[labels.index.to_numpy()] = labels.to_numpy()
+
+    writers = {}
+    paths = {}
+    for batch in batches:
+        table = pa.Table.from_batches([batch])
+        values = table[column].to_numpy()
+        batch_labels = np.full(len(values), -1, dtype=np.int64)
+        known = values < len(lookup)
+        batch_labels[known] = lookup[values[known]]
+        for label in np.unique(batch_labels[batch_labels >= 0]):
+            if label not in writers:
+                paths[label] = table_path(directory, f"part_{label}", cfg)
+                writers[label] = open_table_writer(
+                    paths[label], table.schema, cfg
+                )
+            writers[label].write_table(table.filter(batch_labels == label))
+    for writer in writers.values():
+        writer.close()
+
+    return paths
+
+
+def open_table_writer(path: Path, schema: pa.Schema, cfg: DictConfig):
+    """
+    Opens a writer that appends Arrow tables to a file in the configured
+    storage format, one Parquet row group or Arrow record batch each.
+    """
+    path = Path(path)
+
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        return pq.ParquetWriter(path, schema, compression=cfg.compression)
+    if path.suffix == STORAGE_FORMATS["feather"]:
+        return pa.ipc.new_file(
+            path,
+            schema,
+            options=pa.ipc.IpcWriteOptions(compression=cfg.compression),
+        )
+    raise ValueError(f"Unknown storage format for {path}")
+
+
+def table_schema(path: Path) -> pa.Schema:
+    """
+    Reads the schema of a columnar file without loading any data.
+    """
+    path = Path(path)
+
+    if path.suffix == STORAGE_FORMATS["parquet"]:
+        return pq.read_schema(path)
+    if path.suffix == STORAGE_FORMATS["feather"]:
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema
+    raise ValueError(f"Unknown storage format for {path}")
+
+
+def numeric_columns(schema: pa.Schema) -> list:
+    """
+    Lists the integer, floating point and boolean columns of a schema.
+    """
+    return [
+        field.name
+        for field in schema
+        if pa.types.is_integer(field.type)
+        or pa.types.is_floating(field.type)
+        or pa.types.is_boolean(field.type)
+    ]
+
+
+def concat_tables(tables: list) -> pd.DataFrame:
+    """
+    Concatenates tables row-wise, unifying the categories of category
+    columns instead of falling back to object dtype.
+    """
+    tables = [table.copy() for table in tables]
+
+    for col in tables[0].select_dtypes("category").columns:
+        categories = union_categoricals(
+            [table[col] for table in tables]
+        ).categories
+        for table in tables:
+            table[col] = table[col].cat.set_categories(categories)
+
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Holiday types that close or change the trading day; a `transferred`
+# holiday is celebrated on its `Transfer` day instead
+HOLIDAY_TYPES = ["Holiday", "Transfer", "Additional", "Bridge"]
+HOLIDAY_COLUMNS = [
+    "national_holiday",
+    "regional_holiday",
+    "local_holiday",
+    "is_event",
+    "is_work_day",
+]
+
+
+def read_holidays(holidays_path: Path) -> pd.DataFrame:
+    """
+    Reads the holidays and events that were actually observed.
+    """
+    holidays_df = pd.read_csv(
+        holidays_path,
+        dtype={"type": "category", "locale": "category"},
+        parse_dates=["date"],
+    )
+    holidays_df["date"] = holidays_df["date"].dt.to_period("D")
+
+    return holidays_df[~holidays_df["transferred"]]
+
+
+def read_transactions(transactions_path: Path) -> pd.DataFrame:
+    """
+    Reads the daily number of transactions per store.
+    """
+    transactions_df = pd.read_csv(
+        transactions_path,
+        dtype={"store_nbr": "int16", "transactions": "float32"},
+        parse_dates=["date"],
+    )
+    transactions_df["date"] = transactions_df["date"].dt.to_period("D")
+
+    return transactions_df
+
+
+def store_calendar(
+    stores_df: pd.DataFrame,
+    first_date: pd.Period,
+    last_date: pd.Period,
+    holidays_df: pd.DataFrame = None,
+    transactions_df: pd.DataFrame = None,
+) -> dict:
+    """
+    Precomputes the covariates of every (date, store) pair between two
+    dates as dense (day x store number) arrays: national, regional and
+    local holiday flags resolved against the state and city of every
+    store, event and work day flags, and the number of transactions.
+    """
+    n_days = last_date.ordinal - first_date.ordinal + 1
+    store_numbers = stores_df["store_nbr"].astype(np.int64).to_numpy()
+    shape = (n_days, store_numbers.max() + 1)
+    columns = {}
+
+    if holidays_df is not None:
+        days = holidays_df["date"].array.asi8 - first_date.ordinal
+        holidays_df = holidays_df[(days >= 0) & (days < n_days)].assign(
+            day=days[(days >= 0) & (days < n_days)]
+        )
+        is_holiday = holidays_df["type"].isin(HOLIDAY_TYPES)
+        stores = pd.DataFrame(
+            {
+                "store": store_numbers,
+                "city": stores_df["city"].astype(str).to_numpy(),
+                "state": stores_df["state"].astype(str).to_numpy(),
+            }
+        )
+
+        for col in HOLIDAY_COLUMNS:
+            columns[col] = np.zeros(shape, dtype=np.int8)
+
+        national = holidays_df["locale"] == "National"
+        columns["national_holiday"][
+            holidays_df.loc[national & is_holiday, "day"].to_numpy()
+        ] = 1
+        columns["is_event"][
+            holidays_df.loc[holidays_df["type"] == "Event", "day"].to_numpy()
+        ] = 1
+        columns["is_work_day"][
+            holidays_df.loc[
+                holidays_df["type"] == "Work Day", "day"
+            ].to_numpy()
+        ] = 1
+
+        # Resolve regional and local holidays to the stores they apply to
+        for col, locale, store_col in [
+            ("regional_holiday", "Regional", "state"),
+            ("local_holiday", "Local", "city"),
+        ]:
+            pairs = holidays_df[
+                (holidays_df["locale"] == locale) & is_holiday
+            ].merge(stores, left_on="locale_name", right_on=store_col)
+            columns[col][pairs["day"], pairs["store"]] = 1
+
+    if transactions_df is not None:
+        days = transactions_df["date"].array.asi8 - first_date.ordinal
+        in_range = (days >= 0) & (days < n_days)
+        # Days without a record had no transactions
+        columns["transactions"] = np.zeros(shape, dtype=np.float32)
+        columns["transactions"][
+            days[in_range],
+            transactions_df["store_nbr"].to_numpy()[in_range],
+        ] = transactions_df["transactions"].to_numpy()[in_range]
+
+    return {"first_date": first_date, "columns": columns}
+
+
+def join_store_calendar(data: pd.DataFrame, calendar: dict) -> pd.DataFrame:
+    """
+    Adds the precomputed covariates to every row by indexing the
+    calendar arrays with the row's day offset and store number.
+    """
+    day_keys = data["date"].array.asi8 - calendar["first_date"].ordinal
+    codes, store_nbrs = pd.factorize(data["store_nbr"])
+    store_keys = np.asarray(store_nbrs, dtype=np.int64)[codes]
+
+    for col, values in calendar["columns"].items():
+        data[col] = values[day_keys, store_keys]
+
+    return data
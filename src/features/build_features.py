@@ -1,40 +1,90 @@
 import logging
+import tempfile
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from tsfresh import extract_features
 from datetime import datetime
-from feature_engine.timeseries.forecasting import LagFeatures
-from feature_engine.timeseries.forecasting import WindowFeatures
+from src.data.dtypes import compact_dtypes, save_memory_report
+from src.data.encoders import encoders_path, load_encoders, save_encoders
+from src.data.storage import (
+    load_table,
+    load_table_rows,
+    open_table_writer,
+    save_table,
+    split_table_rows,
+    table_path,
+    table_schema,
+)
+from src.features.series_ops import (
+    LINEAR_TREND_ATTRS,
+    STATISTICAL_CALCULATORS,
+    grouped_rolling,
+    grouped_shift,
+    grouped_statistics,
+    sort_series,
+)
+from src.pipeline.instrumentation import step
 
 logger = logging.getLogger(__name__)
 
+# Peak memory of building a partition relative to the size of its
+# output: the input frame, the sorted copies, the feature blocks and the
+# assembled output are alive at the same time
+WORKING_SET_FACTOR = 4
+
 
 def date_features(data: pd.DataFrame, cfg: DictConfig) -> pd.DataFrame:
     """
     Adds date-related features to the given DataFrame
     based on the specified configuration.
+
+    The features are computed once per calendar day and joined back
+    through the day number of every row.
+    """
+    dates = data["date"].to_numpy().astype("datetime64[D]")
+    first_date = dates.min()
+    day_keys = (dates - first_date).astype(np.int64)
+    calendar = calendar_table(
+        pd.date_range(start=first_date, periods=day_keys.max() + 1, freq="D"),
+        cfg,
+    )
+
+    for col in calendar.columns:
+        data[col] = calendar[col].to_numpy()[day_keys]
+
+    return data
+
+
+def calendar_table(dates: pd.DatetimeIndex, cfg: DictConfig) -> pd.DataFrame:
     """
+    Builds the configured date features of every given date, with the
+    smallest integer dtypes that hold them.
+    """
+    calendar = pd.DataFrame(index=dates)
+
     if cfg.year:
-        data["year"] = data["date"].dt.year
+        calendar["year"] = dates.year.astype(np.int16)
     if cfg.quarter:
-        data["quarter"] = data["date"].dt.quarter
+        calendar["quarter"] = dates.quarter.astype(np.int8)
     if cfg.month:
-        data["month"] = data["date"].dt.month
+        calendar["month"] = dates.month.astype(np.int8)
     if cfg.week:
-        data["week"] = data["date"].dt.isocalendar().week
+        calendar["week"] = dates.isocalendar().week.to_numpy(dtype=np.int8)
     if cfg.day_of_week:
-        data["day_of_week"] = data["date"].dt.dayofweek
+        calendar["day_of_week"] = dates.dayofweek.astype(np.int8)
     if cfg.day_of_month:
-        data["day_of_month"] = data["date"].dt.day
+        calendar["day_of_month"] = dates.day.astype(np.int8)
     if cfg.day_of_year:
-        data["day_of_year"] = data["date"].dt.dayofyear
+        calendar["day_of_year"] = dates.dayofyear.astype(np.int16)
     if cfg.is_weekend:
-        data["is_weekend"] = data["date"].dt.dayofweek >= 5
+        calendar["is_weekend"] = (dates.dayofweek >= 5).astype(np.int8)
     if cfg.is_month_end:
-        data["is_month_end"] = data["date"].dt.is_month_end
+        calendar["is_month_end"] = dates.is_month_end.astype(np.int8)
     if cfg.is_payroll:
-        data["is_payroll"] = data["day_of_month"] == cfg.payroll_day
+        calendar["is_payroll"] = (dates.day == cfg.payroll_day).astype(np.int8)
 
     earthquake_date = (
         pd.to_datetime(cfg.earthquake_date) if cfg.earthquake_date else None
@@ -44,43 +94,82 @@ def date_features(data: pd.DataFrame, cfg: DictConfig) -> pd.DataFrame:
             days=earthquake_date.weekday()
         )
         end_of_week = start_of_week + pd.Timedelta(days=6)
-        data["is_earthquake"] = data["date"].between(
-            start_of_week, end_of_week
-        )
+        calendar["is_earthquake"] = (
+            (dates >= start_of_week) & (dates <= end_of_week)
+        ).astype(np.int8)
 
-    # Convert boolean columns to integers for certain features
-    for col in ["is_weekend", "is_month_end", "is_payroll", "is_earthquake"]:
-        if col in data.columns:
-            data[col] = data[col].astype(int)
-
-    return data
+    return calendar
 
 
 def statistical_features(data: pd.DataFrame, cfg: DictConfig) -> pd.DataFrame:
     """
     Creates statistical features beneficial for time series forecasting
     """
-    feature_extraction_settings = {}
-
-    for feature, settings in cfg.sales.items():
-        if isinstance(settings, dict):
-            feature_extraction_settings[feature] = {
-                k: None for k in settings if settings[k]
+    feature_extraction_settings = {"sales": {}}
+
+    for feature, settings in OmegaConf.to_container(
+        cfg.sales, resolve=True
+    ).items():
+        if isinstance(settings, list):
+            feature_extraction_settings["sales"][feature] = settings
+        elif settings:
+            feature_extraction_settings["sales"][feature] = None
+
+    execution = cfg.execution
+    if execution.native_fast_path and _is_native(
+        feature_extraction_settings["sales"]
+    ):
+        # Aggregate the sorted series blocks directly, skipping tsfresh's
+        # long-format melt and per-chunk dispatch
+        order, starts, _ = sort_series(data)
+        features = grouped_statistics(
+            data["sales"].to_numpy()[order],
+            starts,
+            feature_extraction_settings["sales"],
+        )
+        statistical_features = pd.DataFrame(
+            {
+                "id": data["id"].to_numpy()[order][starts],
+                **{f"sales__{name}": col for name, col in features.items()},
             }
-        elif isinstance(settings, list):
-            feature_extraction_settings[feature] = settings
+        )
+        return statistical_features
+
+    if execution.mode == "serial":
+        n_jobs = 0
+    elif execution.mode == "process":
+        n_jobs = execution.n_jobs
+    else:
+        raise ValueError(
+            f"Unknown statistical feature execution mode: {execution.mode}"
+        )
 
     statistical_features = extract_features(
         data[["id", "date", "sales"]],
         column_id="id",
         column_sort="date",
         kind_to_fc_parameters=feature_extraction_settings,
+        n_jobs=n_jobs,
+        chunksize=execution.chunksize,
     ).reset_index()
     statistical_features = statistical_features.rename(columns={"index": "id"})
 
     return statistical_features
 
 
+def _is_native(fc_parameters: dict) -> bool:
+    """
+    Checks whether every requested calculator has a native implementation.
+    """
+    if not set(fc_parameters) <= STATISTICAL_CALCULATORS:
+        return False
+
+    return all(
+        param.keys() == {"attr"} and param["attr"] in LINEAR_TREND_ATTRS
+        for param in fc_parameters.get("linear_trend") or []
+    )
+
+
 def lag_features(
     data: pd.DataFrame, cfg: DictConfig, forecast_horizon: int
 ) -> pd.DataFrame:
@@ -93,20 +182,42 @@ def lag_features(
     # and specified nonrecursive lags
     lags = [forecast_horizon + lag for lag in pre_lags]
 
-    # Initialize the LagFeatures transformer
-    lag_it = LagFeatures(periods=lags, drop_original=True)
-    transformed_groups = []
+    return _grouped_lags(data, "sales", lags)
 
-    # Group the data by 'id' and apply lag transformation to each group
-    for _, group in data.groupby("id"):
-        transformed_group = lag_it.fit_transform(group[["sales"]])
-        transformed_groups.append(transformed_group)
 
-    # Concatenate the transformed groups
-    # to form the final DataFrame with lagged features
-    lagged_features = pd.concat(transformed_groups)
+def transaction_features(
+    data: pd.DataFrame, cfg: DictConfig, forecast_horizon: int
+) -> pd.DataFrame:
+    """
+    Creates lags of the daily store transactions. Transactions are only
+    known up to the forecast origin, so every lag is offset by the
+    forecast horizon like the sales lags.
+    """
+    lags = [forecast_horizon + lag for lag in cfg.lags]
+
+    return _grouped_lags(data, "transactions", lags)
+
 
-    return lagged_features
+def _grouped_lags(data: pd.DataFrame, column: str, lags: list) -> pd.DataFrame:
+    """
+    Lags a column within every series, named `<column>_lag_<lag>` and
+    indexed in (id, date) order.
+    """
+    # Sort once by (id, date) so every series is a contiguous block
+    order, _, positions = sort_series(data)
+    values = data[column].to_numpy(dtype=np.float32)[order]
+
+    # Shift the whole column per lag, masking rows that cross a series
+    # boundary, straight into a preallocated float32 block
+    lagged = np.empty((len(lags), len(values)), dtype=np.float32)
+    for row, lag in enumerate(lags):
+        grouped_shift(values, positions, lag, out=lagged[row])
+
+    return pd.DataFrame(
+        lagged.T,
+        columns=[f"{column}_lag_{lag}" for lag in lags],
+        index=data.index[order],
+    )
 
 
 def window_features(
@@ -123,20 +234,23 @@ def window_features(
     # specified rolling windows
     windows = [forecast_horizon + window for window in pre_windows]
 
-    # Initialize the WindowFeatures transformer
-    roll_it = WindowFeatures(
-        window=windows, functions=functions, drop_original=True
+    # Sort once by (id, date) so every series is a contiguous block
+    order, _, positions = sort_series(data)
+    sales = data["sales"].to_numpy(dtype=np.float32)[order]
+
+    # Compute all windows x functions in one batch from shared cumulative
+    # sums into a preallocated float32 block
+    windowed = grouped_rolling(sales, positions, windows, functions)
+
+    window_features = pd.DataFrame(
+        windowed.T,
+        columns=[
+            f"sales_window_{window}_{function}"
+            for window in windows
+            for function in functions
+        ],
+        index=data.index[order],
     )
-    transformed_groups = []
-
-    # Group the data by 'id' and apply window transformation to each group
-    for _, group in data.groupby("id"):
-        transformed_group = roll_it.fit_transform(group[["sales"]])
-        transformed_groups.append(transformed_group)
-
-    # Concatenate the transformed groups to form the final DataFrame
-    # with window features
-    window_features = pd.concat(transformed_groups)
 
     return window_features
 
@@ -160,50 +274,343 @@ def build_features(cfg: DictConfig, forecast_horizon: int):
         output_dir.mkdir(parents=True, exist_ok=True)
 
     # Make paths
-    input_data_path = input_dir / "train.csv"
-    processed_data_path = output_dir / "train.pkl"
+    input_data_path = table_path(input_dir, "train", cfg.paths.storage)
+    processed_data_path = table_path(output_dir, "train", cfg.paths.storage)
 
-    # Read the dataset
-    data = pd.read_csv(
-        input_data_path, parse_dates=["date"], infer_datetime_format=True
+    if cfg.build_features.streaming.enabled:
+        _build_streaming(
+            input_data_path, processed_data_path, cfg, forecast_horizon
+        )
+    else:
+        # Read the dataset
+        with step("load") as measurement:
+            data = load_table(input_data_path)
+            measurement["rows_out"] = len(data)
+
+        data = _build_partition(data, cfg, forecast_horizon)
+        if cfg.dtypes.enabled:
+            # Integer columns were narrowed over the whole dataset by
+            # make_dataset, so only the generated features are compacted
+            save_memory_report(
+                compact_dtypes(data, cfg.dtypes, integers=False),
+                output_dir / "memory_report.csv",
+            )
+
+        # Save the processed data
+        with step("save") as measurement:
+            save_table(data, processed_data_path, cfg.paths.storage)
+            measurement["rows_in"] = len(data)
+    logger.info(f"Processed data saved to {processed_data_path}")
+
+    # Keep the vocabularies the categorical codes of this version refer to
+    save_encoders(
+        load_encoders(encoders_path(input_dir)), encoders_path(output_dir)
     )
 
+    logger.info("Feature generation complete.")
+
+    return model_version
+
+
+def _build_partition(
+    data: pd.DataFrame, cfg: DictConfig, forecast_horizon: int
+) -> pd.DataFrame:
+    """
+    Generates and merges every feature of a frame of whole series.
+    """
     # Apply feature generation steps
     logger.info("Creating date features.")
-    data = date_features(data, cfg.build_features.date_features)
+    with step("date_features") as measurement:
+        data = date_features(data, cfg.build_features.date_features)
+        measurement["rows_in"] = len(data)
 
     logger.info("Creating stastical features.")
-    statistical_fea = statistical_features(
-        data, cfg.build_features.statistical_features
-    )
+    with step("statistical_features") as measurement:
+        statistical_fea = statistical_features(
+            data, cfg.build_features.statistical_features
+        )
+        measurement["rows_out"] = len(statistical_fea)
+        if cfg.dtypes.enabled:
+            # Narrow the aggregates before the merge broadcasts them
+            compact_dtypes(statistical_fea, cfg.dtypes, integers=False)
 
     logger.info("Creating lagged features.")
-    lagged_fea = lag_features(
-        data, cfg.build_features.lag_features, forecast_horizon
-    )
+    with step("lag_features"):
+        lagged_fea = lag_features(
+            data, cfg.build_features.lag_features, forecast_horizon
+        )
 
     logger.info("Creating window features.")
-    window_fea = window_features(
-        data, cfg.build_features.window_features, forecast_horizon
+    with step("window_features"):
+        window_fea = window_features(
+            data, cfg.build_features.window_features, forecast_horizon
+        )
+
+    transaction_fea = None
+    if "transactions" in data.columns:
+        logger.info("Creating transaction features.")
+        with step("transaction_features"):
+            transaction_fea = transaction_features(
+                data, cfg.build_features.transaction_features, forecast_horizon
+            )
+
+    # Lags and windows reach at most this many rows back into a series
+    max_offset = forecast_horizon + max(
+        list(cfg.build_features.lag_features.lags)
+        + list(cfg.build_features.window_features.windows)
+        + (
+            list(cfg.build_features.transaction_features.lags)
+            if transaction_fea is not None
+            else []
+        )
     )
 
-    # Merge the features back into the main DataFrame
-    data = data.merge(statistical_fea, on="id", how="left")
-    data = data.merge(
-        lagged_fea, left_index=True, right_index=True, how="left"
+    # Assemble the features with the input columns into one frame
+    with step("merge") as measurement:
+        data = assemble_features(
+            data,
+            statistical_fea,
+            [
+                fea
+                for fea in [lagged_fea, window_fea, transaction_fea]
+                if fea is not None
+            ],
+            max_offset,
+            # Same-day transactions are unknown over the forecast horizon
+            drop=["transactions"],
+        )
+        measurement["rows_out"] = len(data)
+
+    return data
+
+
+def assemble_features(
+    data: pd.DataFrame,
+    statistical_fea: pd.DataFrame,
+    row_features: list,
+    max_offset: int,
+    drop: list = (),
+) -> pd.DataFrame:
+    """
+    Assembles the input columns, the per-id statistical features and the
+    row-aligned feature frames into one frame, writing every feature
+    column by position into a single preallocated block.
+
+    Only rows that are at least `max_offset` rows into their series, so
+    that every lag and window is defined, and whose input columns and
+    statistical features have no missing values are kept. This matches
+    dropping the rows with missing values; the block itself is scanned
+    only if an input column had missing values that lags and windows
+    may have carried forward.
+    """
+    order, _, positions = sort_series(data)
+    series_positions = np.empty(len(data), dtype=positions.dtype)
+    series_positions[order] = positions
+
+    # Broadcast the per-id aggregates through integer id codes
+    stat_cols = [col for col in statistical_fea.columns if col != "id"]
+    id_codes = pd.Index(statistical_fea["id"]).get_indexer(data["id"])
+    stat_valid = statistical_fea[stat_cols].notna().all(axis=1).to_numpy()
+
+    input_cols = [col for col in data.columns if col not in drop]
+    valid = (
+        (series_positions >= max_offset)
+        & (id_codes >= 0)
+        & stat_valid[id_codes]
     )
-    data = data.merge(
-        window_fea, left_index=True, right_index=True, how="left"
+    inputs_complete = True
+    for col in data.columns:
+        if data[col].dtype.kind not in "biu":
+            present = data[col].notna().to_numpy()
+            inputs_complete &= bool(present.all())
+            if col in input_cols:
+                valid &= present
+    valid_rows = np.flatnonzero(valid)
+
+    # Output row of every input row, for the row-aligned frames
+    targets = np.cumsum(valid) - 1
+    feature_cols = stat_cols + [
+        col for features in row_features for col in features.columns
+    ]
+    block = np.empty(
+        (len(valid_rows), len(feature_cols)),
+        dtype=np.result_type(
+            *statistical_fea[stat_cols].dtypes,
+            *[dtype for features in row_features for dtype in features.dtypes],
+        ),
     )
 
-    # Drop rows with missing values that may have been introduced
-    # during feature generation
-    data.dropna(inplace=True)
+    block[:, : len(stat_cols)] = statistical_fea[stat_cols].to_numpy()[
+        id_codes[valid_rows]
+    ]
+    start = len(stat_cols)
+    for features in row_features:
+        rows = data.index.get_indexer(features.index)
+        keep = valid[rows]
+        stop = start + features.shape[1]
+        block[targets[rows[keep]], start:stop] = features.to_numpy()[keep]
+        start = stop
+
+    if not inputs_complete:
+        complete = ~np.isnan(block).any(axis=1)
+        block, valid_rows = block[complete], valid_rows[complete]
+
+    inputs = data.iloc[
+        valid_rows, [data.columns.get_loc(col) for col in input_cols]
+    ]
+    return pd.concat(
+        [
+            inputs,
+            pd.DataFrame(block, columns=feature_cols, index=inputs.index),
+        ],
+        axis=1,
+        copy=False,
+    )
 
-    # Save the processed data
-    data.to_pickle(processed_data_path)
-    logger.info(f"Processed data saved to {processed_data_path}")
 
-    logger.info("Feature generation complete.")
+def _build_streaming(
+    input_data_path: Path,
+    processed_data_path: Path,
+    cfg: DictConfig,
+    forecast_horizon: int,
+):
+    """
+    Builds the features in partitions of whole series, appending each
+    partition to the output file, so that peak memory follows the
+    partition size instead of the dataset size.
+    """
+    row_counts = (
+        load_table(input_data_path, columns=["id"])["id"]
+        .value_counts()
+        .sort_index()
+    )
+    budget = cfg.build_features.streaming.memory_budget_mb * 2**20
+
+    # Every partition must encode category columns with the same
+    # categories, as Arrow files allow a single dictionary per column
+    category_cols = [
+        field.name
+        for field in table_schema(input_data_path)
+        if pa.types.is_dictionary(field.type)
+    ]
+    categories = {
+        col: values.cat.categories
+        for col, values in load_table(
+            input_data_path, columns=category_cols
+        ).items()
+    }
+
+    # Probe the cost of a row on the first series alone
+    table, report = _build_table(
+        load_table_rows(input_data_path, "id", row_counts.index[:1]),
+        cfg,
+        forecast_horizon,
+        categories,
+    )
+    schema = table.schema
+    writer = open_table_writer(processed_data_path, schema, cfg.paths.storage)
+    writer.write_table(table)
+    del table
+    max_rows = int(budget // (WORKING_SET_FACTOR * _row_bytes(schema)))
+
+    # Split the remaining series into partitions within the budget with
+    # one pass over the input, so each partition reads only its own rows
+    labels = _partition_labels(row_counts.iloc[1:], max_rows)
+    with tempfile.TemporaryDirectory(dir=processed_data_path.parent) as spill:
+        spill_paths = split_table_rows(
+            input_data_path, "id", labels, spill, cfg.paths.storage
+        )
+        for partition, spill_path in sorted(spill_paths.items()):
+            table, partition_report = _build_table(
+                load_table(spill_path), cfg, forecast_horizon, categories
+            )
+            if report is not None:
+                report = report.assign(
+                    **{
+                        col: report[col] + partition_report[col]
+                        for col in ["mb_before", "mb_after", "mb_saved"]
+                    }
+                )
+            writer.write_table(table.cast(schema))
+            logger.info(
+                f"Appended features of {(labels == partition).sum()} series."
+            )
+            del table
+    writer.close()
+
+    if report is not None:
+        save_memory_report(
+            report, processed_data_path.parent / "memory_report.csv"
+        )
 
-    return model_version
+
+def _build_table(
+    data: pd.DataFrame,
+    cfg: DictConfig,
+    forecast_horizon: int,
+    categories: dict,
+):
+    """
+    Builds the features of a partition as an Arrow table with the shared
+    categories, returning it with its memory report if dtypes are
+    compacted.
+    """
+    data = _build_partition(data, cfg, forecast_horizon)
+    for col, col_categories in categories.items():
+        data[col] = data[col].cat.set_categories(col_categories)
+
+    report = None
+    if cfg.dtypes.enabled:
+        report = compact_dtypes(data, cfg.dtypes, integers=False)
+
+    table = pa.Table.from_pandas(
+        data.reset_index(drop=True), preserve_index=False
+    )
+    return table, report
+
+
+def _row_bytes(schema: pa.Schema) -> int:
+    """
+    Estimates the in-memory size of a row of the schema, counting eight
+    bytes for every variable-width value.
+    """
+    row_bytes = 0
+    for field in schema:
+        try:
+            row_bytes += max(field.type.bit_width // 8, 1)
+        except ValueError:
+            row_bytes += 8
+
+    return row_bytes
+
+
+def _partition_labels(row_counts: pd.Series, max_rows: int) -> pd.Series:
+    """
+    Assigns consecutive series to partitions of at most `max_rows` rows,
+    returning the partition of every series id.
+    """
+    counts = row_counts.to_numpy()
+    labels = np.empty(len(counts), dtype=np.int64)
+    position = 0
+    partition = 0
+    while position < len(counts):
+        stop = position + _partition_size(counts[position:], max_rows)
+        labels[position:stop] = partition
+        position = stop
+        partition += 1
+
+    return pd.Series(labels, index=row_counts.index)
+
+
+def _partition_size(row_counts: np.ndarray, max_rows: int) -> int:
+    """
+    Returns how many of the next series fit within `max_rows` rows,
+    always taking at least one.
+    """
+    fits = int(np.searchsorted(np.cumsum(row_counts), max_rows, "right"))
+    if fits == 0:
+        logger.warning(
+            f"A series of {row_counts[0]} rows exceeds the memory budget."
+        )
+
+    return max(fits, 1)
@@ -0,0 +1,304 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+ROLLING_FUNCTIONS = {"mean", "sum", "std", "var", "max", "min"}
+
+# Calculators `grouped_statistics` computes natively, with the
+# linear_trend attributes it supports
+STATISTICAL_CALCULATORS = {
+    "mean",
+    "variance",
+    "standard_deviation",
+    "maximum",
+    "minimum",
+    "skewness",
+    "kurtosis",
+    "linear_trend",
+}
+LINEAR_TREND_ATTRS = {"pvalue", "rvalue", "intercept", "slope", "stderr"}
+
+
+def sort_series(
+    data: pd.DataFrame, id_col: str = "id", time_col: str = "date"
+):
+    """
+    Sorts the rows once by (id, date) and describes the contiguous
+    per-series blocks of the sorted layout.
+
+    Returns the row order, the start offset of every series block and the
+    position of every sorted row inside its own series.
+    """
+    # lexsort is stable, so rows sharing (id, date) keep their input order
+    order = np.lexsort((data[time_col].to_numpy(), data[id_col].to_numpy()))
+    ids = data[id_col].to_numpy()[order]
+
+    n_rows = len(ids)
+    is_start = np.ones(n_rows, dtype=bool)
+    if n_rows > 1:
+        is_start[1:] = ids[1:] != ids[:-1]
+    starts = np.flatnonzero(is_start)
+
+    lengths = np.diff(np.append(starts, n_rows))
+    positions = np.arange(n_rows) - np.repeat(starts, lengths)
+
+    return order, starts, positions
+
+
+def grouped_shift(
+    values: np.ndarray, positions: np.ndarray, period: int, out=None
+) -> np.ndarray:
+    """
+    Shifts the sorted values by `period` rows without crossing a series
+    boundary. Rows that would read from the previous series are NaN.
+    """
+    if out is None:
+        out = np.empty(len(values), dtype=np.float32)
+
+    n_rows = len(values)
+    out[: min(period, n_rows)] = np.nan
+    if period < n_rows:
+        out[period:] = values[: n_rows - period]
+    out[positions < period] = np.nan
+
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Maximum over the trailing `window` values ending at every row, using
+    the van Herk/Gil-Werman block scheme so the cost does not depend on
+    the window length. The first `window - 1` rows are undefined.
+    """
+    n_rows = len(values)
+    n_blocks = -(-n_rows // window)
+
+    padded = np.full(n_blocks * window, -np.inf, dtype=np.float64)
+    padded[:n_rows] = values
+    blocks = padded.reshape(n_blocks, window)
+
+    # Running max from the left and from the right of every block
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    result = np.full(n_rows, np.nan)
+    ends = np.arange(window - 1, n_rows)
+    result[ends] = np.maximum(suffix[ends - window + 1], prefix[ends])
+
+    return result
+
+
+def grouped_rolling(
+    values: np.ndarray,
+    positions: np.ndarray,
+    windows: list,
+    functions: list,
+    out=None,
+) -> np.ndarray:
+    """
+    Computes every window x function over the sorted values in one batch.
+    Each row gets the statistic of the `window` values right before it in
+    its own series, so rows with fewer predecessors are NaN.
+
+    Sums and sums of squares come from shared cumulative sums, which makes
+    every window cost the same regardless of its length.
+    """
+    unknown = set(functions) - ROLLING_FUNCTIONS
+    if unknown:
+        raise ValueError(f"Unsupported window functions: {sorted(unknown)}")
+
+    n_rows = len(values)
+    if out is None:
+        out = np.empty(
+            (len(windows) * len(functions), n_rows), dtype=np.float32
+        )
+    if n_rows == 0:
+        return out
+
+    # Center every series on its own mean so the sum of squares does not
+    # lose precision to large running totals
+    starts = np.flatnonzero(positions == 0)
+    lengths = np.diff(np.append(starts, n_rows))
+    missing = np.isnan(values)
+    filled = np.where(missing, 0.0, values).astype(np.float64)
+    offsets = np.repeat(np.add.reduceat(filled, starts) / lengths, lengths)
+    centered = filled - offsets
+
+    # Running totals restart at every series, so they stay on the scale
+    # of one series instead of growing over all of them
+    csum = _grouped_cumsum(centered, starts, lengths)
+    csum_sq = _grouped_cumsum(centered**2, starts, lengths)
+    cmissing = np.concatenate(([0], np.cumsum(missing)))
+
+    row = 0
+    for window in windows:
+        valid = positions >= window
+        valid[window:] &= (
+            cmissing[window:n_rows] == cmissing[: n_rows - window]
+        )
+
+        window_sum = np.full(n_rows, np.nan)
+        window_sum[window:] = csum[window:] - csum[: n_rows - window]
+
+        window_max = window_min = None
+        if {"max", "std", "var"} & set(functions):
+            window_max = _shift_one(rolling_max(values, window))
+        if {"min", "std", "var"} & set(functions):
+            window_min = -_shift_one(rolling_max(-values, window))
+
+        for function in functions:
+            if function in ("mean", "sum"):
+                result = window_sum + window * offsets
+                if function == "mean":
+                    result = result / window
+            elif function in ("std", "var"):
+                window_sum_sq = np.full(n_rows, np.nan)
+                window_sum_sq[window:] = (
+                    csum_sq[window:] - csum_sq[: n_rows - window]
+                )
+                result = np.maximum(
+                    (window_sum_sq - window_sum**2 / window) / (window - 1),
+                    0.0,
+                )
+                # Constant windows have exactly zero spread
+                result[window_max == window_min] = 0.0
+                if function == "std":
+                    result = np.sqrt(result)
+            elif function == "max":
+                result = window_max
+            else:
+                result = window_min
+
+            out[row] = result
+            out[row, ~valid] = np.nan
+            row += 1
+
+    return out
+
+
+def _grouped_cumsum(
+    values: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> np.ndarray:
+    """
+    Sums the values before every row within its own series, so the
+    difference of two rows of a series is the sum of the rows between.
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    for start, length in zip(starts, lengths):
+        # Row i + 1 holds the sum up to row i, the last row is not needed
+        first, stop = start + 1, start + length
+        last = stop - 1
+        out[start] = 0.0
+        np.cumsum(values[start:last], out=out[first:stop])
+
+    return out
+
+
+def _shift_one(values: np.ndarray) -> np.ndarray:
+    shifted = np.empty_like(values)
+    shifted[:1] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+def grouped_statistics(
+    values: np.ndarray, starts: np.ndarray, fc_parameters: dict
+) -> dict:
+    """
+    Natively computes tsfresh's simple aggregate calculators for every
+    sorted series block, keyed by tsfresh's `<calculator>[__<params>]`
+    feature names.
+    """
+    n_rows = len(values)
+    lengths = np.diff(np.append(starts, n_rows))
+    count = lengths.astype(np.float64)
+    values = values.astype(np.float64)
+
+    mean = np.add.reduceat(values, starts) / count
+    deviation = values - np.repeat(mean, lengths)
+    sum_sq = np.add.reduceat(deviation**2, starts)
+
+    features = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for calculator, params in fc_parameters.items():
+            if calculator == "mean":
+                features["mean"] = mean
+            elif calculator == "variance":
+                features["variance"] = sum_sq / count
+            elif calculator == "standard_deviation":
+                features["standard_deviation"] = np.sqrt(sum_sq / count)
+            elif calculator == "maximum":
+                features["maximum"] = np.maximum.reduceat(values, starts)
+            elif calculator == "minimum":
+                features["minimum"] = np.minimum.reduceat(values, starts)
+            elif calculator == "skewness":
+                # Bias-corrected, as pandas.Series.skew
+                sum_cube = np.add.reduceat(deviation**3, starts)
+                result = (
+                    count
+                    * np.sqrt(count - 1)
+                    / (count - 2)
+                    * sum_cube
+                    / sum_sq**1.5
+                )
+                result[sum_sq == 0] = 0.0
+                result[count < 3] = np.nan
+                features["skewness"] = result
+            elif calculator == "kurtosis":
+                # Bias-corrected excess kurtosis, as pandas.Series.kurtosis
+                sum_quad = np.add.reduceat(deviation**4, starts)
+                numerator = count * (count + 1) * (count - 1) * sum_quad
+                denominator = (count - 2) * (count - 3) * sum_sq**2
+                adjustment = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+                result = numerator / denominator - adjustment
+                result[denominator == 0] = 0.0
+                result[count < 4] = np.nan
+                features["kurtosis"] = result
+            elif calculator == "linear_trend":
+                trend = _linear_trend(values, starts, lengths, mean, sum_sq)
+                for param in params or []:
+                    attr = param["attr"]
+                    features[f'linear_trend__attr_"{attr}"'] = trend[attr]
+
+    return features
+
+
+def _linear_trend(values, starts, lengths, mean, sum_sq):
+    # Least squares fit of the values against their position in the series,
+    # following scipy.stats.linregress
+    count = lengths.astype(np.float64)
+    positions = np.arange(len(values)) - np.repeat(starts, lengths)
+    position_mean = (count - 1) / 2
+    ssxm = (count**2 - 1) / 12
+    ssym = sum_sq / count
+    ssxym = (
+        np.add.reduceat(
+            (positions - np.repeat(position_mean, lengths))
+            * (values - np.repeat(mean, lengths)),
+            starts,
+        )
+        / count
+    )
+
+    rvalue = np.where(
+        (ssxm == 0) | (ssym == 0), 0.0, ssxym / np.sqrt(ssxm * ssym)
+    )
+    rvalue = np.clip(rvalue, -1.0, 1.0)
+    slope = ssxym / ssxm
+    intercept = mean - slope * position_mean
+
+    dof = count - 2
+    tiny = 1.0e-20
+    t_stat = rvalue * np.sqrt(
+        dof / ((1.0 - rvalue + tiny) * (1.0 + rvalue + tiny))
+    )
+    pvalue = 2 * stats.t.sf(np.abs(t_stat), dof)
+    stderr = np.sqrt((1 - rvalue**2) * ssym / ssxm / dof)
+
+    return {
+        "pvalue": pvalue,
+        "rvalue": rvalue,
+        "intercept": intercept,
+        "slope": slope,
+        "stderr": stderr,
+    }
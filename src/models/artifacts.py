@@ -0,0 +1,153 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from darts import TimeSeries
+
+# Version of the index layout, raised whenever it changes
+ARTIFACT_FORMAT_VERSION = 2
+
+
+def series_artifact_files(path: Path) -> list:
+    """
+    Lists the files making up a series artifact: the offset table and
+    the block of series values.
+    """
+    return [Path(path) / "index.json", Path(path) / "values.npy"]
+
+
+def save_series_artifact(series: list, path: Path):
+    """
+    Writes a list of TimeSeries as one contiguous float32 array of
+    per-series blocks plus an index with every series' id, row offset,
+    length, start date and static covariates, and the component names
+    and frequency the series share.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    lengths = np.array([len(ts) for ts in series], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    n_components = series[0].n_components if series else 1
+
+    values = np.lib.format.open_memmap(
+        path / "values.npy",
+        mode="w+",
+        dtype=np.float32,
+        shape=(int(lengths.sum()), n_components),
+    )
+    for ts, start, length in zip(series, offsets, lengths):
+        stop = start + length
+        values[start:stop] = ts.values(copy=False)
+    values.flush()
+    del values
+
+    static_covariates = (
+        pd.concat([ts.static_covariates for ts in series], ignore_index=True)
+        if series and series[0].has_static_covariates
+        else pd.DataFrame()
+    )
+
+    index = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "freq": series[0].freq_str if series else "D",
+        "time_name": series[0].time_index.name if series else None,
+        "components": list(series[0].components) if series else [],
+        "ids": [int(ts.static_covariates["id"].iloc[0]) for ts in series],
+        "offsets": offsets.tolist(),
+        "lengths": lengths.tolist(),
+        "starts": [str(ts.start_time()) for ts in series],
+        "static_covariates": {
+            "columns": list(static_covariates.columns),
+            "values": static_covariates.to_numpy().tolist(),
+        },
+    }
+    with open(path / "index.json", "w") as file:
+        json.dump(index, file)
+
+
+def open_series_artifact(path: Path) -> dict:
+    """
+    Opens a series artifact: reads its offset table and memory-maps the
+    values, so reading a series touches only its own block.
+    """
+    path = Path(path)
+
+    with open(path / "index.json") as file:
+        artifact = json.load(file)
+
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported series artifact format in {path}, "
+            f"expected version {ARTIFACT_FORMAT_VERSION}"
+        )
+
+    artifact["values"] = np.load(path / "values.npy", mmap_mode="r")
+    artifact["positions"] = {
+        id: position for position, id in enumerate(artifact["ids"])
+    }
+
+    return artifact
+
+
+def read_series_block(artifact: dict, id: int, last: int = None):
+    """
+    Reads the time index and values of one series, optionally only its
+    `last` time steps.
+    """
+    position = artifact["positions"][id]
+    offset = artifact["offsets"][position]
+    length = artifact["lengths"][position]
+
+    skip = max(length - last, 0) if last is not None else 0
+    start, stop = offset + skip, offset + length
+    values = np.asarray(artifact["values"][start:stop])
+    time_index = pd.date_range(
+        start=artifact["starts"][position],
+        periods=length,
+        freq=artifact["freq"],
+    )[skip:]
+
+    return time_index, values
+
+
+def load_series_artifact(
+    path: Path, ids: list = None, components: list = None, end=None
+) -> list:
+    """
+    Rebuilds the TimeSeries of a series artifact, or of the given ids
+    only, from their memory-mapped blocks. `components` selects some of
+    the components and `end` drops the time steps after a timestamp.
+
+    Blocks are stored time-major, so selecting components copies less
+    but still reads the whole rows of every series from disk.
+    """
+    artifact = open_series_artifact(path)
+    static_covariates = artifact["static_covariates"]
+    columns = artifact["components"] if components is None else components
+    selected = [artifact["components"].index(col) for col in columns]
+
+    series = []
+    for id in artifact["ids"] if ids is None else ids:
+        position = artifact["positions"][id]
+        time_index, values = read_series_block(artifact, id)
+        if end is not None:
+            steps = int((time_index <= end).sum())
+            time_index, values = time_index[:steps], values[:steps]
+        series.append(
+            TimeSeries.from_times_and_values(
+                time_index.rename(artifact["time_name"]),
+                values if components is None else values[:, selected],
+                columns=columns,
+                static_covariates=(
+                    pd.DataFrame(
+                        [static_covariates["values"][position]],
+                        columns=static_covariates["columns"],
+                    )
+                    if static_covariates["columns"]
+                    else None
+                ),
+            )
+        )
+
+    return series
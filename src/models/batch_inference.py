@@ -0,0 +1,133 @@
+import logging
+import numpy as np
+import pandas as pd
+from darts import TimeSeries
+from darts.models import LightGBMModel
+
+logger = logging.getLogger(__name__)
+
+PREDICT_ENGINES = ["batch", "darts"]
+
+
+def predict_series(
+    model, n: int, y: list, future_cov: list, engine: str
+) -> list:
+    """
+    Forecasts `n` steps of every series with the configured engine. The
+    batch engine falls back to darts for models it does not support.
+    """
+    if engine not in PREDICT_ENGINES:
+        raise ValueError(f"Unknown prediction engine: {engine}")
+
+    if engine == "batch":
+        if supports_batch_forecast(model):
+            return batch_forecast(model, n, y, future_cov)
+        logger.warning("Model not supported by the batch engine, using darts")
+
+    return model.predict(n=n, series=y, future_covariates=future_cov)
+
+
+def supports_batch_forecast(model) -> bool:
+    """
+    Checks whether the batch engine reproduces the model's predictions:
+    a deterministic LightGBM model forecasting one step at a time from
+    target lags, future covariate lags and static covariates.
+    """
+    return (
+        isinstance(model, LightGBMModel)
+        and model.likelihood is None
+        and model.output_chunk_length == 1
+        and set(model.lags) <= {"target", "future"}
+        and not model.component_lags
+    )
+
+
+def batch_forecast(
+    model: LightGBMModel, n: int, y: list, future_cov: list = None
+) -> list:
+    """
+    Forecasts `n` steps of every series like `model.predict`, without
+    darts' per-series lagged tables: each step's feature matrix of all
+    series is gathered from stacked arrays of the target history and the
+    future covariates, and the LightGBM booster is called once per step
+    on it. Every prediction is fed back as the newest target lag of the
+    next step.
+
+    Returns a forecast TimeSeries per series.
+    """
+    if not supports_batch_forecast(model):
+        raise ValueError("The model is not supported by the batch engine")
+    if any(ts.width != 1 for ts in y):
+        raise ValueError("The batch engine forecasts univariate series only")
+
+    target_lags = np.asarray(model.lags["target"])
+    future_lags = np.asarray(model.lags.get("future", []), dtype=np.int64)
+    history = -target_lags.min()
+    n_series = len(y)
+
+    # Target history of every series, followed by room for the forecasts
+    targets = np.empty((n_series, history + n), dtype=np.float64)
+    for row, ts in enumerate(y):
+        if len(ts) < history:
+            raise ValueError(
+                f"Series need at least {history} values to be forecast"
+            )
+        targets[row, :history] = ts.values(copy=False)[-history:, 0]
+
+    # Future covariates over every step, from the earliest lag onwards
+    n_future = 0
+    if future_lags.size:
+        n_future = future_cov[0].width
+        span = n + future_lags.max() - future_lags.min()
+        futures = np.empty((n_series, span, n_future), dtype=np.float64)
+        for row, (ts, cov) in enumerate(zip(y, future_cov)):
+            first = ts.end_time() + (1 + future_lags.min()) * ts.freq
+            start = (first - cov.start_time()) // cov.freq
+            stop = start + span
+            if start < 0 or stop > len(cov):
+                raise ValueError(
+                    "Future covariates do not cover the forecast horizon"
+                )
+            futures[row] = cov.values(copy=False)[start:stop]
+
+    # Static covariates repeat on every step
+    statics = np.empty((n_series, 0))
+    if model.uses_static_covariates and model.static_covariates is not None:
+        statics = np.stack(
+            [ts.static_covariates_values(copy=False)[0] for ts in y]
+        ).astype(np.float64)
+
+    # Feature columns in darts' order: target lags, future covariate
+    # lags (every component of a lag together) and static covariates
+    n_target = len(target_lags)
+    n_lagged = n_target + len(future_lags) * n_future
+    features = np.empty(
+        (n_series, n_lagged + statics.shape[1]), dtype=np.float64
+    )
+    features[:, n_lagged:] = statics
+
+    booster = model.model.booster_
+    for step in range(n):
+        features[:, :n_target] = targets[:, history + step + target_lags]
+        for position, lag in enumerate(future_lags):
+            start = n_target + position * n_future
+            stop = start + n_future
+            features[:, start:stop] = futures[
+                :, step + lag - future_lags.min()
+            ]
+        targets[:, history + step] = booster.predict(features)
+
+    forecasts = []
+    for ts, values in zip(y, targets[:, history:]):
+        forecasts.append(
+            TimeSeries.from_times_and_values(
+                pd.date_range(
+                    start=ts.end_time() + ts.freq, periods=n, freq=ts.freq
+                ),
+                values[:, np.newaxis],
+                columns=ts.columns,
+                static_covariates=ts.static_covariates,
+            )
+        )
+
+    return forecasts
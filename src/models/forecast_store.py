@@ -0,0 +1,157 @@
+import json
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from omegaconf import DictConfig
+from src.models.artifacts import open_series_artifact, read_series_block
+
+logger = logging.getLogger(__name__)
+
+
+def forecasts_path(
+    cfg: DictConfig, forecast_horizon: int, model_version: str
+) -> Path:
+    """
+    Returns the path of the precomputed forecasts for a horizon and model
+    version.
+    """
+    return (
+        Path(cfg.paths.forecast_store_path)
+        / model_version
+        / f"horizon_{forecast_horizon}.parquet"
+    )
+
+
+def series_forecast_frame(history, actual, forecast) -> pd.DataFrame:
+    """
+    Collects the history, the holdout actuals and the forecast of one
+    series, each given as a (time index, values) pair, into a long frame
+    with a `kind` column.
+    """
+    parts = []
+    for kind, (time_index, values) in [
+        ("history", history),
+        ("actual", actual),
+        ("forecast", forecast),
+    ]:
+        parts.append(
+            pd.DataFrame(
+                {
+                    "kind": kind,
+                    "date": time_index,
+                    "sales": values[:, 0].astype(np.float32),
+                }
+            )
+        )
+
+    frame = pd.concat(parts, ignore_index=True)
+    frame["kind"] = pd.Categorical(
+        frame["kind"], categories=["history", "actual", "forecast"]
+    )
+
+    return frame
+
+
+def save_forecasts(cfg: DictConfig, forecast_horizon: int, model_version: str):
+    """
+    Stores the forecasts of a model version with one Parquet row group
+    per series id, so a single series can be read on its own, and marks
+    the version as the latest for the horizon.
+
+    The actuals and forecasts are cut to `forecast_horizon` steps, so the
+    predictions of a model version trained for a longer horizon serve
+    every shorter one.
+    """
+    input_dir = Path(cfg.paths.interim_data_path) / model_version
+    output_path = forecasts_path(cfg, forecast_horizon, model_version)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    y_train = open_series_artifact(input_dir / "y_train")
+    y_holdout = open_series_artifact(input_dir / "y_holdout")
+    y_pred = open_series_artifact(input_dir / "y_preds")
+
+    writer = None
+    for id in y_pred["ids"]:
+        frame = series_forecast_frame(
+            read_series_block(
+                y_train, id, last=cfg.forecast_store.history_days
+            ),
+            _head(read_series_block(y_holdout, id), forecast_horizon),
+            _head(read_series_block(y_pred, id), forecast_horizon),
+        )
+        frame.insert(0, "id", id)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+
+        if writer is None:
+            writer = pq.ParquetWriter(
+                output_path, table.schema, compression="zstd"
+            )
+        writer.write_table(table)
+
+    if writer is None:
+        # No series were predicted, store an empty table with the schema
+        empty_block = (
+            pd.DatetimeIndex([]),
+            np.empty((0, 1), dtype=np.float32),
+        )
+        frame = series_forecast_frame(empty_block, empty_block, empty_block)
+        frame.insert(0, "id", pd.Series(dtype=np.int64))
+        schema = pa.Schema.from_pandas(frame, preserve_index=False)
+        writer = pq.ParquetWriter(output_path, schema, compression="zstd")
+    writer.close()
+
+    # Point the horizon at this model version
+    latest = latest_versions(cfg)
+    latest[forecast_horizon] = model_version
+    with open(Path(cfg.paths.forecast_store_path) / "latest.json", "w") as f:
+        json.dump({str(h): v for h, v in latest.items()}, f, indent=2)
+
+    logger.info(f"Forecasts saved to {output_path}")
+
+
+def _head(block, n: int):
+    time_index, values = block
+
+    return time_index[:n], values[:n]
+
+
+def latest_versions(cfg: DictConfig) -> dict:
+    """
+    Returns the latest model version with stored forecasts per horizon.
+    """
+    latest_path = Path(cfg.paths.forecast_store_path) / "latest.json"
+    if not latest_path.exists():
+        return {}
+
+    with open(latest_path) as file:
+        return {int(h): v for h, v in json.load(file).items()}
+
+
+def open_forecasts(path: Path):
+    """
+    Opens stored forecasts and maps every series id to its row group.
+    """
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    id_column = parquet_file.schema_arrow.get_field_index("id")
+
+    row_groups = {
+        metadata.row_group(i).column(id_column).statistics.min: i
+        for i in range(metadata.num_row_groups)
+    }
+
+    return parquet_file, row_groups
+
+
+def read_series_forecast(forecasts, id: int) -> pd.DataFrame:
+    """
+    Reads the stored forecast frame of a single series.
+    """
+    parquet_file, row_groups = forecasts
+
+    return parquet_file.read_row_group(
+        row_groups[id], columns=["kind", "date", "sales"]
+    ).to_pandas()
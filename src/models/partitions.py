@@ -0,0 +1,126 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from darts.models import LightGBMModel
+from src.models.batch_inference import predict_series
+
+logger = logging.getLogger(__name__)
+
+
+def series_partitions(series: list, labels: dict) -> dict:
+    """
+    Groups the positions of a list of TimeSeries by the partition label
+    of their series id.
+    """
+    partitions = {}
+    for position, ts in enumerate(series):
+        label = labels[int(ts.static_covariates["id"].iloc[0])]
+        partitions.setdefault(label, []).append(position)
+
+    return partitions
+
+
+def threads_per_worker(n_jobs: int) -> int:
+    """
+    Splits the cores between the workers, so LightGBM's own threads do
+    not oversubscribe them.
+    """
+    return max((os.cpu_count() or 1) // n_jobs, 1)
+
+
+def fit_partitions(
+    y: list,
+    future_cov: list,
+    labels: dict,
+    model_params: dict,
+    n_jobs: int,
+    init_models: dict = None,
+) -> dict:
+    """
+    Fits one LightGBMModel per partition of the series, running the
+    partitions in a process pool. Partitions with a model in
+    `init_models` continue boosting its trees.
+
+    Returns a {label: model} mapping.
+    """
+    partitions = series_partitions(y, labels)
+    tasks = [
+        (
+            [y[i] for i in positions],
+            [future_cov[i] for i in positions],
+            {**model_params, "n_jobs": threads_per_worker(n_jobs)},
+            (init_models or {}).get(label),
+        )
+        for label, positions in partitions.items()
+    ]
+
+    logger.info(
+        f"Fitting {len(tasks)} partition models with {n_jobs} workers."
+    )
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        models = list(executor.map(_fit_partition, tasks))
+
+    return dict(zip(partitions, models))
+
+
+def predict_partitions(
+    models: dict,
+    n: int,
+    y: list,
+    future_cov: list,
+    labels: dict,
+    n_jobs: int,
+    engine: str = "darts",
+) -> list:
+    """
+    Predicts every series with the model of its partition and the given
+    prediction engine, running the
+    partitions in a process pool unless `n_jobs` is 1, and returns the
+    forecasts in the order of `y`.
+    """
+    partitions = series_partitions(y, labels)
+    tasks = [
+        (
+            models[label],
+            n,
+            [y[i] for i in positions],
+            [future_cov[i] for i in positions],
+            engine,
+        )
+        for label, positions in partitions.items()
+    ]
+
+    if n_jobs == 1:
+        # Skip the pool for small, latency-bound requests
+        forecasts = list(map(_predict_partition, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            forecasts = list(executor.map(_predict_partition, tasks))
+
+    y_pred = [None] * len(y)
+    for positions, partition_pred in zip(partitions.values(), forecasts):
+        for position, ts in zip(positions, partition_pred):
+            y_pred[position] = ts
+
+    return y_pred
+
+
+def _fit_partition(task):
+    y, future_cov, model_params, init_model = task
+    model = LightGBMModel(**model_params)
+    if init_model is None:
+        model.fit(series=y, future_covariates=future_cov)
+    else:
+        model.fit(
+            series=y,
+            future_covariates=future_cov,
+            init_model=init_model.model.booster_,
+        )
+
+    return model
+
+
+def _predict_partition(task):
+    model, n, y, future_cov, engine = task
+
+    return predict_series(model, n, y, future_cov, engine)
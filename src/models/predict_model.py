@@ -2,46 +2,98 @@ import logging
 import pickle
 from pathlib import Path
 from omegaconf import DictConfig
-from darts.models import LightGBMModel
+from src.models.artifacts import load_series_artifact, save_series_artifact
+from src.models.batch_inference import predict_series
+from src.models.partitions import predict_partitions
+from src.pipeline.instrumentation import step
 
 logger = logging.getLogger(__name__)
 
 
-def predict_model(cfg: DictConfig, forecast_horizon: int, model_version: str):
+def load_model(cfg: DictConfig, model_version: str):
     """
-    Creates predictions for spesified forecast horizon
+    Loads the trained model of a version, or its partition models with
+    the partition of every series id when training was partitioned. The
+    format is told by the saved file, not by the current config.
+    """
+    model_path = Path(cfg.paths.model_save_path) / f"model_{model_version}.pkl"
+
+    with open(model_path, "rb") as file:
+        return pickle.load(file)
+
+
+def is_partitioned(model) -> bool:
+    """
+    Tells the `{"labels", "models"}` payload of partitioned training
+    apart from a single model.
+    """
+    return isinstance(model, dict) and model.keys() == {"labels", "models"}
+
+
+def load_prediction_inputs(cfg: DictConfig, model_version: str):
+    """
+    Loads the training targets and the holdout future covariates the
+    predictions of a version continue from.
     """
-    # Construct paths to the input and output directories
     input_dir = Path(cfg.paths.interim_data_path) / model_version
-    output_dir = Path(cfg.paths.interim_data_path) / model_version
-    model_dir = Path(cfg.paths.model_save_path)
 
-    # Make paths
-    model_path = model_dir / f"model_{model_version}.pkl"
-    y_train_path = input_dir / "y_train.pkl"
-    future_cov_holdout_path = input_dir / "future_cov_holdout.pkl"
-    predictions_path = output_dir / "y_preds.pkl"
+    y_train = load_series_artifact(input_dir / "y_train")
+    future_cov_holdout = load_series_artifact(input_dir / "future_cov_holdout")
 
-    # Load the model
-    model = LightGBMModel.load(model_path)
+    return y_train, future_cov_holdout
 
-    # Load y_train and future_cov_valid TimeSeries objects
-    with open(y_train_path, "rb") as file:
-        y_train = pickle.load(file)
 
-    with open(future_cov_holdout_path, "rb") as file:
-        future_cov_holdout = pickle.load(file)
+def forecast(
+    cfg: DictConfig, model, n: int, y: list, future_cov: list, n_jobs: int
+) -> list:
+    """
+    Forecasts `n` steps of every series with a model from `load_model`
+    and the prediction engine of `predict.engine`.
+    """
+    if is_partitioned(model):
+        # Predict every partition with its own model
+        return predict_partitions(
+            model["models"],
+            n=n,
+            y=y,
+            future_cov=future_cov,
+            labels=model["labels"],
+            n_jobs=n_jobs,
+            engine=cfg.predict.engine,
+        )
+
+    return predict_series(model, n, y, future_cov, cfg.predict.engine)
+
+
+def predict_model(cfg: DictConfig, forecast_horizon: int, model_version: str):
+    """
+    Creates predictions for spesified forecast horizon
+    """
+    # Construct paths to the output directory
+    output_dir = Path(cfg.paths.interim_data_path) / model_version
+    predictions_path = output_dir / "y_preds"
+
+    with step("load") as measurement:
+        model = load_model(cfg, model_version)
+        y_train, future_cov_holdout = load_prediction_inputs(
+            cfg, model_version
+        )
+        measurement["series"] = len(y_train)
 
     # Make predictions using the loaded model and TimeSeries objects
-    y_pred = model.predict(
-        n=forecast_horizon,
-        series=y_train,
-        future_covariates=future_cov_holdout,
-    )
+    with step("predict"):
+        y_pred = forecast(
+            cfg,
+            model,
+            n=forecast_horizon,
+            y=y_train,
+            future_cov=future_cov_holdout,
+            n_jobs=cfg.train.partition.n_jobs,
+        )
 
     logger.info("Prediction completed.")
 
-    with open(predictions_path, "wb") as f:
-        pickle.dump(y_pred, f)
+    with step("save"):
+        save_series_artifact(y_pred, predictions_path)
 
     logger.info(f"Saved to {predictions_path}")
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import numpy as np
+from pathlib import Path
+from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+REFRESH_STATE = "refresh_state.json"
+
+
+def refresh_base(
+    cfg: DictConfig,
+    interim_dir: Path,
+    model_dir: Path,
+    model_version: str,
+    signature: str,
+    reference: dict,
+):
+    """
+    Finds the refresh state of the latest earlier model version and
+    decides whether the new version may continue boosting its model.
+
+    Returns that state, or None when the model must be fitted from
+    scratch: refreshing is disabled, there is no earlier model with the
+    same features and parameters, `full_fit_every` refreshes have
+    followed the last full fit, or the target drifted further than
+    `drift_threshold` from the last full fit.
+    """
+    if not cfg.enabled:
+        return None
+
+    # Latest earlier version trained with the same features and
+    # parameters, e.g. skipping the versions of other forecast horizons
+    state = None
+    for path in sorted(Path(interim_dir).glob(f"*/{REFRESH_STATE}")):
+        if (
+            path.parent.name >= model_version
+            or not (Path(model_dir) / f"model_{path.parent.name}.pkl").exists()
+        ):
+            continue
+        with open(path) as file:
+            candidate = json.load(file)
+        if candidate["signature"] == signature:
+            state = candidate
+    if state is None:
+        logger.info(
+            "No earlier model with the same features and parameters, "
+            "fitting from scratch."
+        )
+        return None
+
+    if state["refreshes"] >= cfg.full_fit_every:
+        logger.info(
+            f"{state['refreshes']} refreshes since the full fit of "
+            f"{state['full_fit_version']}, fitting from scratch."
+        )
+        return None
+
+    drift = target_drift(state["reference"], reference)
+    if drift > cfg.drift_threshold:
+        logger.info(
+            f"Target drift of {drift:.3f} exceeds {cfg.drift_threshold}, "
+            "fitting from scratch."
+        )
+        return None
+
+    logger.info(
+        f"Refreshing model version {state['version']} "
+        f"(target drift {drift:.3f})."
+    )
+    return state
+
+
+def save_refresh_state(
+    output_dir: Path,
+    model_version: str,
+    signature: str,
+    reference: dict,
+    base: dict = None,
+):
+    """
+    Records how a model version was trained, for the next refresh: the
+    last full fit it descends from, the refreshes since then and the
+    target reference of that full fit.
+    """
+    if base is None:
+        state = {
+            "version": model_version,
+            "full_fit_version": model_version,
+            "refreshes": 0,
+            "signature": signature,
+            "reference": reference,
+        }
+    else:
+        state = {
+            **base,
+            "version": model_version,
+            "refreshes": base["refreshes"] + 1,
+        }
+
+    with open(Path(output_dir) / REFRESH_STATE, "w") as file:
+        json.dump(state, file, indent=2)
+
+
+def model_signature(**settings) -> str:
+    """
+    Fingerprints the settings a model's trees depend on, such as the
+    feature columns and the model parameters.
+    """
+    return hashlib.sha256(
+        json.dumps(settings, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def target_reference(y: list, window_days: int) -> dict:
+    """
+    Summarises the target over the most recent `window_days` of every
+    series.
+    """
+    values = np.concatenate(
+        [ts.values(copy=False)[-window_days:, 0] for ts in y]
+    )
+
+    return {"mean": float(values.mean()), "std": float(values.std())}
+
+
+def target_drift(reference: dict, current: dict) -> float:
+    """
+    Measures the shift of the recent target mean from the reference, in
+    reference standard deviations.
+    """
+    return abs(current["mean"] - reference["mean"]) / max(
+        reference["std"], np.finfo(np.float32).eps
+    )
+
+
+def recent_series(y: list, window_days: int, history: int) -> list:
+    """
+    Keeps the most recent `window_days` of every series, plus the
+    `history` values their first lagged rows read from.
+    """
+    keep = window_days + history
+
+    return [ts[-keep:] for ts in y]
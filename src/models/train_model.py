@@ -3,8 +3,25 @@ import pickle
 import pandas as pd
 from pathlib import Path
 from omegaconf import DictConfig
-from darts import TimeSeries
 from darts.models import LightGBMModel
+from src.data.storage import (
+    load_table,
+    numeric_columns,
+    table_path,
+    table_schema,
+)
+from src.models.artifacts import save_series_artifact
+from src.models.partitions import fit_partitions
+from src.models.predict_model import load_model
+from src.models.refresh import (
+    model_signature,
+    recent_series,
+    refresh_base,
+    save_refresh_state,
+    target_reference,
+)
+from src.models.series_builder import build_series_groups
+from src.pipeline.instrumentation import step
 
 logger = logging.getLogger(__name__)
 
@@ -23,104 +40,128 @@ def train_model(cfg: DictConfig, forecast_horizon: int, model_version: str):
     model_dir = Path(cfg.paths.model_save_path)
 
     # Make paths
-    input_data_path = input_dir / "train.pkl"
+    input_data_path = table_path(input_dir, "train", cfg.paths.storage)
     model_save_path = model_dir / f"model_{model_version}.pkl"
-    y_train_path = output_dir / "y_train.pkl"
-    future_cov_train_path = output_dir / "future_cov_train.pkl"
-    y_holdout_path = output_dir / "y_holdout.pkl"
-    future_cov_holdout_path = output_dir / "future_cov_holdout.pkl"
 
-    # Read the dataset
-    with open(input_data_path, "rb") as file:
-        data = pickle.load(file)
+    # Select the columns used for modelling: the target, the static
+    # covariates and every numeric feature as a future covariate
+    static_cov_cols = list(cfg.train.static_cov_cols)
+    future_cov_cols = [
+        col
+        for col in numeric_columns(table_schema(input_data_path))
+        if col not in set(static_cov_cols) | {"id", "date", "sales"}
+    ]
+
+    # Read only the selected columns of the dataset
+    columns = ["id", "date", "sales"] + static_cov_cols + future_cov_cols
+    partition_by = cfg.train.partition.by
+    if partition_by and partition_by not in columns:
+        columns.append(partition_by)
+    with step("load") as measurement:
+        data = load_table(input_data_path, columns=columns)
+        measurement["rows_out"] = len(data)
 
     # Data split
     cutoff_date = data["date"].max() - pd.Timedelta(forecast_horizon, unit="D")
 
-    train = data[data["date"] <= cutoff_date].copy()
-    holdout = data[data["date"] > cutoff_date].copy()
-
-    # Model building
-    static_cov_cols = list(cfg.train.static_cov_cols)
-    future_cov_cols = list(
-        set(train.columns)
-        - set(static_cov_cols)
-        - set(["id", "date", "sales"])
-    )
-
-    y_train = TimeSeries.from_group_dataframe(
-        train,
-        group_cols="id",
-        time_col="date",
-        static_cols=static_cov_cols,
-        value_cols=["sales"],
-        fill_missing_dates=True,
-        freq="D",
-        fillna_value=0,
-    )
-
-    future_cov_train = TimeSeries.from_group_dataframe(
-        train,
-        group_cols="id",
-        time_col="date",
-        static_cols=static_cov_cols,
-        value_cols=future_cov_cols,
-        fill_missing_dates=True,
-        freq="D",
-        fillna_value=0,
-    )
-
-    y_holdout = TimeSeries.from_group_dataframe(
-        holdout,
-        group_cols="id",
-        time_col="date",
-        static_cols=static_cov_cols,
-        value_cols=["sales"],
-        fill_missing_dates=True,
-        freq="D",
-        fillna_value=0,
-    )
-
-    future_cov_holdout = TimeSeries.from_group_dataframe(
-        holdout,
-        group_cols="id",
-        time_col="date",
-        static_cols=static_cov_cols,
-        value_cols=future_cov_cols,
-        fill_missing_dates=True,
-        freq="D",
-        fillna_value=0,
-    )
-
-    model = LightGBMModel(
+    # Build the target and covariate series of both splits in one pass
+    with step("build_series") as measurement:
+        groups = build_series_groups(
+            data,
+            value_cols={"y": ["sales"], "future_cov": future_cov_cols},
+            static_cols=static_cov_cols,
+            cutoff_date=cutoff_date,
+        )
+        measurement["rows_in"] = len(data)
+        measurement["series"] = len(groups["y"][0])
+    y_train, y_holdout = groups["y"]
+    future_cov_train, future_cov_holdout = groups["future_cov"]
+
+    model_params = dict(
         lags=list(cfg.train.target_lags),
         lags_future_covariates=[0],
         use_static_covariates=True,
         verbose=-1,
     )
-    model.fit(series=y_train, future_covariates=future_cov_train)
 
-    # Saving processes
-    model.save(str(model_save_path))
+    # Continue boosting the previous version's model on recent data,
+    # unless a fit from scratch is due
+    refresh_cfg = cfg.train.refresh
+    signature = model_signature(
+        static_cov_cols=static_cov_cols,
+        future_cov_cols=future_cov_cols,
+        model_params=model_params,
+        partition_by=partition_by,
+    )
+    reference = target_reference(y_train, refresh_cfg.window_days)
+    base = refresh_base(
+        refresh_cfg,
+        Path(cfg.paths.interim_data_path),
+        model_dir,
+        model_version,
+        signature,
+        reference,
+    )
+    if base is None:
+        y_fit, fit_params, init_model = y_train, model_params, None
+    else:
+        y_fit = recent_series(
+            y_train,
+            refresh_cfg.window_days,
+            history=-min(cfg.train.target_lags),
+        )
+        fit_params = {
+            **model_params,
+            "n_estimators": refresh_cfg.n_estimators,
+        }
+        init_model = load_model(cfg, base["version"])
+
+    with step("fit") as measurement:
+        measurement["refresh"] = base is not None
+        if partition_by:
+            # One model per partition, fitted in parallel
+            first_rows = data.groupby("id")[partition_by].first()
+            labels = {int(id): label for id, label in first_rows.items()}
+            models = fit_partitions(
+                y_fit,
+                future_cov_train,
+                labels,
+                fit_params,
+                n_jobs=cfg.train.partition.n_jobs,
+                init_models=(
+                    None if init_model is None else init_model["models"]
+                ),
+            )
+
+            # Saving processes
+            with open(model_save_path, "wb") as f:
+                pickle.dump({"labels": labels, "models": models}, f)
+        else:
+            model = LightGBMModel(**fit_params)
+            if init_model is None:
+                model.fit(series=y_fit, future_covariates=future_cov_train)
+            else:
+                model.fit(
+                    series=y_fit,
+                    future_covariates=future_cov_train,
+                    init_model=init_model.model.booster_,
+                )
+
+            # Saving processes
+            model.save(str(model_save_path))
+    save_refresh_state(output_dir, model_version, signature, reference, base)
     logger.info(f"Model saved to {model_save_path}")
 
-    with open(y_train_path, "wb") as f:
-        pickle.dump(y_train, f)
-    logger.info(f"Y values for training saved to {y_train_path}")
-
-    with open(future_cov_train_path, "wb") as f:
-        pickle.dump(future_cov_train, f)
-    logger.info(f"Future training covariates saved to {future_cov_train_path}")
-
-    with open(y_holdout_path, "wb") as f:
-        pickle.dump(y_holdout, f)
-    logger.info(f"Actual Y values for holdout saved to {y_holdout_path}")
-
-    with open(future_cov_holdout_path, "wb") as f:
-        pickle.dump(future_cov_holdout, f)
-    logger.info(
-        f"Future holdout covariates saved to {future_cov_holdout_path}"
-    )
+    # Memory-mapped series artifacts
+    with step("save_series"):
+        for name, series in [
+            ("y_train", y_train),
+            ("future_cov_train", future_cov_train),
+            ("y_holdout", y_holdout),
+            ("future_cov_holdout", future_cov_holdout),
+        ]:
+            save_series_artifact(series, output_dir / name)
+            logger.info(f"Series {name} saved to {output_dir / name}")
 
     logger.info(
         f"Model and associated data saved for model version {model_version}."
@@ -0,0 +1,285 @@
+import itertools
+import json
+import logging
+import shutil
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from omegaconf import DictConfig, OmegaConf
+from darts.models import LightGBMModel
+from src.data.storage import (
+    load_table,
+    numeric_columns,
+    table_path,
+    table_schema,
+)
+from src.models.artifacts import load_series_artifact, save_series_artifact
+from src.models.batch_inference import predict_series
+from src.models.partitions import threads_per_worker
+from src.models.series_builder import build_series_groups
+from src.pipeline.cache import load_index
+from src.pipeline.pipeline import build_version, evict_versions
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_grid(cfg: DictConfig) -> list:
+    """
+    Lists the candidate configurations of the `tune.search` grid, or a
+    random sample of `tune.max_candidates` of them.
+    """
+    search = OmegaConf.to_container(cfg.search, resolve=True)
+    candidates = [
+        {
+            "target_lags": target_lags,
+            "lags": lags,
+            "windows": windows,
+            "model_params": model_params or {},
+        }
+        for target_lags, lags, windows, model_params in itertools.product(
+            search["target_lags"],
+            search["lags"],
+            search["windows"],
+            search["model_params"],
+        )
+    ]
+
+    if cfg.max_candidates and cfg.max_candidates < len(candidates):
+        rng = np.random.default_rng(cfg.seed)
+        chosen = rng.choice(len(candidates), cfg.max_candidates, replace=False)
+        candidates = [candidates[i] for i in sorted(chosen)]
+
+    return candidates
+
+
+def candidate_columns(
+    candidate: dict,
+    columns: list,
+    functions: list,
+    forecast_horizon: int,
+) -> list:
+    """
+    Selects the future covariates of a candidate from the superset
+    feature columns: every column except the sales lags and windows,
+    plus the candidate's own lags and windows.
+    """
+    own = {f"sales_lag_{forecast_horizon + lag}" for lag in candidate["lags"]}
+    own |= {
+        f"sales_window_{forecast_horizon + window}_{function}"
+        for window in candidate["windows"]
+        for function in functions
+    }
+
+    return [
+        col
+        for col in columns
+        if col in own or not col.startswith(("sales_lag_", "sales_window_"))
+    ]
+
+
+def tune(cfg: DictConfig, forecast_horizon: int) -> pd.DataFrame:
+    """
+    Searches the candidate target lags, sales lags, windows and LightGBM
+    parameters of `tune.search` with backtests.
+
+    The superset of every candidate's features is built once, through
+    the cached pipeline stages, and saved as memory-mapped series
+    artifacts of its version that the workers share. Candidates
+    are evaluated fold by fold, most recent first, on a process pool;
+    after each fold the candidates whose error exceeds the best one's by
+    `tune.prune_ratio` are dropped.
+
+    Returns the leaderboard, also written to `leaderboard.csv`.
+    """
+    tune_cfg = cfg.tune
+    candidates = candidate_grid(tune_cfg)
+    logger.info(f"Tuning {len(candidates)} candidate configurations.")
+
+    # The union of the candidates' lags and windows
+    superset_cfg = OmegaConf.merge(
+        cfg,
+        OmegaConf.create(
+            {
+                "build_features": {
+                    "lag_features": {
+                        "lags": sorted(
+                            {lag for c in candidates for lag in c["lags"]}
+                        )
+                    },
+                    "window_features": {
+                        "windows": sorted(
+                            {w for c in candidates for w in c["windows"]}
+                        )
+                    },
+                }
+            }
+        ),
+    )
+    # Build the features of every candidate in one pass through the cached
+    # stages, so reruns reuse them and the cache evicts them
+    index = (
+        load_index(Path(cfg.paths.cache_path)) if cfg.cache.enabled else None
+    )
+    model_version = build_version(superset_cfg, forecast_horizon, index)
+    version_dir = Path(cfg.paths.interim_data_path) / model_version
+    output_dir = Path(tune_cfg.output_path) / model_version
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    input_data_path = table_path(version_dir, "train", cfg.paths.storage)
+    static_cov_cols = list(cfg.train.static_cov_cols)
+    future_cov_cols = [
+        col
+        for col in numeric_columns(table_schema(input_data_path))
+        if col not in set(static_cov_cols) | {"id", "date", "sales"}
+    ]
+    last_date = load_table(input_data_path, columns=["date"])["date"].max()
+
+    # Share the series with the workers as memory-mapped artifacts of
+    # the version
+    artifact_dir = version_dir / "tune"
+    if not (artifact_dir / "future_cov" / "index.json").exists():
+        data = load_table(
+            input_data_path,
+            columns=["id", "date", "sales"]
+            + static_cov_cols
+            + future_cov_cols,
+        )
+        groups = build_series_groups(
+            data,
+            value_cols={"y": ["sales"], "future_cov": future_cov_cols},
+            static_cols=static_cov_cols,
+            cutoff_date=last_date,
+        )
+        del data
+        save_series_artifact(groups["y"][0], artifact_dir / "y")
+        save_series_artifact(
+            groups["future_cov"][0], artifact_dir / "future_cov"
+        )
+        del groups
+
+    functions = list(cfg.build_features.window_features.functions)
+    errors = [[] for _ in candidates]
+    alive = list(range(len(candidates)))
+    n_jobs = tune_cfg.n_jobs
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        for fold in range(1, tune_cfg.folds + 1):
+            cutoff = last_date - pd.Timedelta(fold * forecast_horizon, "D")
+            tasks = [
+                (
+                    artifact_dir,
+                    candidates[i],
+                    candidate_columns(
+                        candidates[i],
+                        future_cov_cols,
+                        functions,
+                        forecast_horizon,
+                    ),
+                    cutoff,
+                    forecast_horizon,
+                    threads_per_worker(n_jobs),
+                )
+                for i in alive
+            ]
+            fold_errors = list(executor.map(_backtest_fold, tasks))
+            for i, error in zip(alive, fold_errors):
+                errors[i].append(error)
+
+            best = min(fold_errors)
+            pruned = [
+                i
+                for i, error in zip(alive, fold_errors)
+                if error > tune_cfg.prune_ratio * best
+            ]
+            alive = [i for i in alive if i not in pruned]
+            logger.info(
+                f"Fold {fold} up to {cutoff.date()}: best MAE {best:.4f}, "
+                f"pruned {len(pruned)}, {len(alive)} candidates left."
+            )
+
+    leaderboard = pd.DataFrame(
+        [
+            {
+                "target_lags": json.dumps(candidate["target_lags"]),
+                "lags": json.dumps(candidate["lags"]),
+                "windows": json.dumps(candidate["windows"]),
+                "model_params": json.dumps(candidate["model_params"]),
+                "folds": len(errors[i]),
+                "mean_mae": float(np.mean(errors[i])),
+                **{
+                    f"fold_{fold}_mae": error
+                    for fold, error in enumerate(errors[i], start=1)
+                },
+            }
+            for i, candidate in enumerate(candidates)
+        ]
+    )
+    leaderboard = leaderboard.sort_values(
+        ["folds", "mean_mae"], ascending=[False, True], ignore_index=True
+    )
+    leaderboard.index.name = "rank"
+
+    leaderboard_path = output_dir / "leaderboard.csv"
+    leaderboard.to_csv(leaderboard_path)
+    logger.info(f"Leaderboard saved to {leaderboard_path}")
+
+    if index is not None:
+        evict_versions(cfg, index, keep=model_version)
+    else:
+        # Untracked by the cache, so the superset version is not kept
+        shutil.rmtree(version_dir)
+
+    return leaderboard
+
+
+def _backtest_fold(task) -> float:
+    """
+    Fits a candidate on the series up to the fold's cutoff and returns
+    the mean absolute error of its forecasts over the next horizon.
+    """
+    (
+        artifact_dir,
+        candidate,
+        future_cov_cols,
+        cutoff,
+        forecast_horizon,
+        n_threads,
+    ) = task
+    fold_end = cutoff + pd.Timedelta(forecast_horizon, "D")
+
+    y = load_series_artifact(artifact_dir / "y", end=fold_end)
+    future_cov = load_series_artifact(
+        artifact_dir / "future_cov", components=future_cov_cols, end=fold_end
+    )
+
+    # Keep the series observed on both sides of the cutoff
+    history = -min(candidate["target_lags"])
+    y_train, y_test, future_cov_fold = [], [], []
+    for ts, cov in zip(y, future_cov):
+        train_steps = int((ts.time_index <= cutoff).sum())
+        if train_steps > history and train_steps < len(ts):
+            y_train.append(ts[:train_steps])
+            y_test.append(ts[train_steps:])
+            future_cov_fold.append(cov)
+
+    model = LightGBMModel(
+        lags=candidate["target_lags"],
+        lags_future_covariates=[0],
+        use_static_covariates=True,
+        verbose=-1,
+        n_jobs=n_threads,
+        **candidate["model_params"],
+    )
+    model.fit(series=y_train, future_covariates=future_cov_fold)
+    y_pred = predict_series(
+        model, forecast_horizon, y_train, future_cov_fold, "batch"
+    )
+
+    absolute_errors = [
+        np.abs(
+            pred.values(copy=False)[: len(actual), 0]
+            - actual.values(copy=False)[: len(pred), 0]
+        )
+        for pred, actual in zip(y_pred, y_test)
+    ]
+    return float(np.concatenate(absolute_errors).mean())
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def load_index(cache_dir: Path) -> dict:
+    """
+    Loads the cache index: the recorded stage entries and the memoized
+    fingerprints of source files.
+    """
+    index_path = Path(cache_dir) / "index.json"
+    if not index_path.exists():
+        return {"entries": {}, "fingerprints": {}}
+
+    with open(index_path) as file:
+        return json.load(file)
+
+
+def save_index(index: dict, cache_dir: Path):
+    """
+    Saves the cache index.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(cache_dir / "index.json", "w") as file:
+        json.dump(index, file, indent=2)
+
+
+def file_fingerprint(path: Path, index: dict) -> str:
+    """
+    Hashes the content of a file. The digest is memoized by size and
+    modification time, so unchanged files are not read again.
+    """
+    path = Path(path)
+    stat = path.stat()
+    memo = index["fingerprints"].get(str(path))
+    if memo and memo["stamp"] == [stat.st_size, stat.st_mtime_ns]:
+        return memo["digest"]
+
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+
+    index["fingerprints"][str(path)] = {
+        "stamp": [stat.st_size, stat.st_mtime_ns],
+        "digest": digest.hexdigest(),
+    }
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, inputs: list, config, index: dict) -> str:
+    """
+    Builds the content address of a stage run from the fingerprints of
+    its input files and its config subtree.
+    """
+    payload = json.dumps(
+        {
+            "stage": stage,
+            "inputs": {
+                str(path): file_fingerprint(path, index) for path in inputs
+            },
+            "config": config,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lookup(index: dict, key: str):
+    """
+    Returns the entry recorded for a stage key if all of its outputs are
+    still on disk unchanged, otherwise None.
+    """
+    entry = index["entries"].get(key)
+    if entry is None:
+        return None
+
+    for path, stamp in entry["outputs"].items():
+        if _stamp(Path(path)) != stamp:
+            del index["entries"][key]
+            return None
+
+    entry["last_used"] = time.time()
+    return entry
+
+
+def record(
+    index: dict,
+    key: str,
+    stage: str,
+    result,
+    outputs: list,
+    model_version: str = None,
+):
+    """
+    Records the result and the outputs of a stage run under its key.
+    """
+    index["entries"][key] = {
+        "stage": stage,
+        "result": result,
+        "outputs": {str(path): _stamp(Path(path)) for path in outputs},
+        "model_version": model_version,
+        "last_used": time.time(),
+    }
+
+
+def evict(
+    index: dict,
+    interim_dir: Path,
+    model_dir: Path,
+    max_bytes: int,
+    keep: set = frozenset(),
+):
+    """
+    Deletes the least recently used model versions, their interim
+    directory and their model file, until the cached versions fit in
+    `max_bytes`. The versions in `keep` are never evicted.
+    """
+    last_used = {}
+    for entry in index["entries"].values():
+        version = entry["model_version"]
+        if version is not None:
+            last_used[version] = max(
+                last_used.get(version, 0), entry["last_used"]
+            )
+
+    sizes = {
+        version: _version_paths_size(version, interim_dir, model_dir)
+        for version in last_used
+    }
+    total = sum(sizes.values())
+
+    for version in sorted(last_used, key=last_used.get):
+        if total <= max_bytes:
+            break
+        if version in keep:
+            continue
+
+        logger.info(f"Evicting cached model version {version}")
+        shutil.rmtree(Path(interim_dir) / version, ignore_errors=True)
+        (Path(model_dir) / f"model_{version}.pkl").unlink(missing_ok=True)
+        total -= sizes[version]
+
+        index["entries"] = {
+            key: entry
+            for key, entry in index["entries"].items()
+            if entry["model_version"] != version
+        }
+
+
+def _version_paths_size(version: str, interim_dir: Path, model_dir: Path):
+    paths = list((Path(interim_dir) / version).rglob("*"))
+    paths.append(Path(model_dir) / f"model_{version}.pkl")
+
+    return sum(path.stat().st_size for path in paths if path.is_file())
+
+
+def _stamp(path: Path):
+    if not path.exists():
+        return None
+
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
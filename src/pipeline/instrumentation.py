@@ -0,0 +1,188 @@
+import cProfile
+import json
+import logging
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Measurements of the active run, None outside of a run
+_run = None
+
+
+def start_run(cfg):
+    """
+    Starts collecting the measurements of a pipeline run, configured by
+    the `instrumentation` config section.
+    """
+    global _run
+    if not cfg.enabled:
+        _run = None
+        return
+
+    _run = {
+        "started": datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f"),
+        "steps": {},
+        "stack": [],
+        "profile_stage": cfg.profile_stage,
+        "profiles": {},
+    }
+
+
+def finish_run(report_dir: Path):
+    """
+    Writes the run report, and the profile of the profiled stage if it
+    ran, into `report_dir` and stops collecting. The files are named
+    after the start of the run, so a cached rerun of the same model
+    version keeps the reports of earlier runs.
+    """
+    global _run
+    if _run is None:
+        return None
+
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    for stage, profile in _run["profiles"].items():
+        profile_path = report_dir / f"profile_{stage}_{_run['started']}.prof"
+        profile.dump_stats(profile_path)
+        logger.info(f"Profile of {stage} saved to {profile_path}")
+
+    report_path = report_dir / f"run_report_{_run['started']}.json"
+    with open(report_path, "w") as file:
+        json.dump(
+            {
+                "steps": [
+                    {"step": path, **summary}
+                    for path, summary in _run["steps"].items()
+                ]
+            },
+            file,
+            indent=2,
+        )
+    logger.info(f"Run report saved to {report_path}")
+
+    _run = None
+    return report_path
+
+
+@contextmanager
+def step(name: str):
+    """
+    Measures the wall time, CPU time (including reaped child processes)
+    and peak RSS of a stage or of a sub-step nested in one. The yielded
+    record takes extra counts such as `rows_in`, `rows_out` and
+    `artifact_bytes`.
+
+    Repeated steps with the same path, such as the steps of every
+    partition of a streaming build, are summed into one record.
+    """
+    record = {}
+    if _run is None:
+        yield record
+        return
+
+    stack = _run["stack"]
+    path = "/".join([frame["path"] for frame in stack[-1:]] + [name])
+    if stack:
+        # Keep the enclosing step's peak before the counter is reset
+        stack[-1]["peak"] = max(stack[-1]["peak"], peak_rss_mb())
+    frame = {"path": path, "peak": 0.0}
+    stack.append(frame)
+
+    profile = None
+    if name == _run["profile_stage"] and len(stack) == 1:
+        profile = _run["profiles"].setdefault(name, cProfile.Profile())
+        profile.enable()
+
+    _reset_peak_rss()
+    start_wall = time.perf_counter()
+    start_cpu = _cpu_seconds()
+    try:
+        yield record
+    finally:
+        if profile is not None:
+            profile.disable()
+
+        wall_seconds = time.perf_counter() - start_wall
+        cpu_seconds = _cpu_seconds() - start_cpu
+        # The peak RSS counter was reset by nested steps, so combine the
+        # current reading with their peaks
+        peak = max(peak_rss_mb(), frame["peak"])
+        stack.pop()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+
+        summary = _run["steps"].setdefault(
+            path,
+            {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0},
+        )
+        summary["calls"] += 1
+        summary["wall_seconds"] += wall_seconds
+        summary["cpu_seconds"] += cpu_seconds
+        summary["peak_rss_mb"] = max(summary.get("peak_rss_mb", 0.0), peak)
+        for key, value in record.items():
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and key in summary
+            ):
+                summary[key] += value
+            else:
+                summary[key] = value
+
+
+def artifact_bytes(paths) -> int:
+    """
+    Returns the total size of files and directories on disk.
+    """
+    total = 0
+    for path in map(Path, paths):
+        if path.is_dir():
+            total += sum(
+                file.stat().st_size
+                for file in path.rglob("*")
+                if file.is_file()
+            )
+        elif path.exists():
+            total += path.stat().st_size
+
+    return total
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the current process, since
+    it started or since the counter was last reset.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+
+def _cpu_seconds() -> float:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def _reset_peak_rss():
+    """
+    Resets the peak RSS of the process to its current RSS where the
+    kernel supports it (Linux), so a step's peak excludes earlier steps.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
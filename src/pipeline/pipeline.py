@@ -0,0 +1,204 @@
+import logging
+from pathlib import Path
+from omegaconf import DictConfig, OmegaConf
+from src.data.encoders import encoders_path
+from src.data.make_dataset import make_dataset
+from src.data.series_ids import series_ids_path
+from src.data.storage import table_path
+from src.features.build_features import build_features
+from src.models.artifacts import series_artifact_files
+from src.models.forecast_store import latest_versions
+from src.models.refresh import REFRESH_STATE
+from src.models.train_model import train_model
+from src.models.predict_model import predict_model
+from src.pipeline.instrumentation import (
+    artifact_bytes,
+    finish_run,
+    start_run,
+    step,
+)
+from src.pipeline.cache import (
+    evict,
+    load_index,
+    lookup,
+    record,
+    save_index,
+    stage_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_pipeline(cfg: DictConfig, forecast_horizon: int) -> str:
+    """
+    Runs make_dataset, build_features, train_model and predict_model,
+    skipping every stage whose inputs and config match a cached run.
+
+    Returns the model version holding the predictions.
+    """
+    interim_dir = Path(cfg.paths.interim_data_path)
+    model_dir = Path(cfg.paths.model_save_path)
+
+    start_run(cfg.instrumentation)
+    index = (
+        load_index(Path(cfg.paths.cache_path)) if cfg.cache.enabled else None
+    )
+
+    # Steps 1 and 2: Data preparation and feature building
+    model_version = build_version(cfg, forecast_horizon, index)
+    version_dir = interim_dir / model_version
+    model_path = model_dir / f"model_{model_version}.pkl"
+
+    # Step 3: Model training
+    _run_stage(
+        index,
+        "train_model",
+        inputs=[table_path(version_dir, "train", cfg.paths.storage)],
+        config=[_config(cfg.train), forecast_horizon],
+        run=lambda: train_model(
+            cfg, model_version=model_version, forecast_horizon=forecast_horizon
+        ),
+        outputs=lambda _: [
+            model_path,
+            version_dir / REFRESH_STATE,
+            *series_artifact_files(version_dir / "y_train"),
+            *series_artifact_files(version_dir / "future_cov_train"),
+            *series_artifact_files(version_dir / "y_holdout"),
+            *series_artifact_files(version_dir / "future_cov_holdout"),
+        ],
+        model_version=model_version,
+    )
+
+    # Step 4: Make predictions
+    _run_stage(
+        index,
+        "predict_model",
+        inputs=[
+            model_path,
+            *series_artifact_files(version_dir / "y_train"),
+            *series_artifact_files(version_dir / "future_cov_holdout"),
+        ],
+        config=[_config(cfg.predict), forecast_horizon],
+        run=lambda: predict_model(
+            cfg, model_version=model_version, forecast_horizon=forecast_horizon
+        ),
+        outputs=lambda _: series_artifact_files(version_dir / "y_preds"),
+        model_version=model_version,
+    )
+
+    if index is not None:
+        evict_versions(cfg, index, keep=model_version)
+
+    # Timings, memory and sizes of every stage, next to the artifacts
+    finish_run(version_dir)
+
+    return model_version
+
+
+def build_version(cfg: DictConfig, forecast_horizon: int, index) -> str:
+    """
+    Runs the make_dataset and build_features stages, skipping those with
+    a cached run in `index` (None runs both).
+
+    Returns the model version holding the features.
+    """
+    input_dir = Path(cfg.paths.input_data_path)
+    processed_dir = Path(cfg.paths.processed_data_path)
+    interim_dir = Path(cfg.paths.interim_data_path)
+    storage = _config(cfg.paths.storage)
+    processed_path = table_path(processed_dir, "train", cfg.paths.storage)
+
+    # Step 1: Data preparation
+    _run_stage(
+        index,
+        "make_dataset",
+        inputs=[
+            input_dir / "train.csv",
+            input_dir / "stores.csv",
+            input_dir / "transactions.csv",
+            Path(cfg.paths.external_data_path) / "oil.csv",
+            Path(cfg.paths.external_data_path) / "holidays_events.csv",
+        ],
+        config=[_config(cfg.make_dataset), _config(cfg.dtypes), storage],
+        run=lambda: make_dataset(cfg),
+        outputs=lambda _: [
+            processed_path,
+            series_ids_path(cfg),
+            encoders_path(processed_dir),
+        ],
+    )
+
+    # Step 2: Feature building
+    return _run_stage(
+        index,
+        "build_features",
+        inputs=[processed_path, encoders_path(processed_dir)],
+        config=[
+            _config(cfg.build_features),
+            _config(cfg.dtypes),
+            storage,
+            forecast_horizon,
+        ],
+        run=lambda: build_features(cfg, forecast_horizon=forecast_horizon),
+        outputs=lambda version: [
+            table_path(interim_dir / version, "train", cfg.paths.storage),
+            encoders_path(interim_dir / version),
+        ],
+        versioned=True,
+    )
+
+
+def evict_versions(cfg: DictConfig, index: dict, keep: str):
+    """
+    Evicts the least recently used cached model versions beyond
+    `cache.max_size_mb` and saves the index. The `keep` version and the
+    versions served from the forecast store are never evicted.
+    """
+    evict(
+        index,
+        Path(cfg.paths.interim_data_path),
+        Path(cfg.paths.model_save_path),
+        max_bytes=int(cfg.cache.max_size_mb * 2**20),
+        keep={keep, *latest_versions(cfg).values()},
+    )
+    save_index(index, Path(cfg.paths.cache_path))
+
+
+def _run_stage(
+    index,
+    stage,
+    inputs,
+    config,
+    run,
+    outputs,
+    model_version=None,
+    versioned=False,
+):
+    """
+    Runs a stage unless a cached run with the same content address still
+    has its outputs on disk, and returns the stage's result.
+    """
+    with step(stage) as measurement:
+        measurement["cached"] = False
+        if index is None:
+            result = run()
+        else:
+            key = stage_key(stage, inputs, config, index)
+            entry = lookup(index, key)
+            if entry is not None:
+                logger.info(f"Skipping {stage}, cached as {key[:12]}")
+                measurement["cached"] = True
+                return entry["result"]
+
+            result = run()
+            if versioned:
+                model_version = result
+            record(index, key, stage, result, outputs(result), model_version)
+
+        measurement["artifact_bytes"] = artifact_bytes(outputs(result))
+
+    return result
+
+
+def _config(cfg: DictConfig):
+    return OmegaConf.to_container(cfg, resolve=True)
@@ -0,0 +1,142 @@
+import json
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from omegaconf import DictConfig
+from src.models.forecast_store import latest_versions
+from src.serving.service import forecast_ids, version_cache
+
+logger = logging.getLogger(__name__)
+
+
+def make_handler(cfg: DictConfig, load_version):
+    """
+    Builds the request handler answering
+
+    - `GET /health`
+    - `GET /forecast?ids=1,2&horizon=28&version=<model version>`
+
+    where `horizon` defaults to `train.forecast_horizon` and `version` to
+    the latest version with stored forecasts for the horizon.
+    """
+
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                self._send(HTTPStatus.OK, {"status": "ok"})
+            elif url.path == "/forecast":
+                self._forecast(parse_qs(url.query))
+            else:
+                self._send(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+        def _forecast(self, query):
+            try:
+                ids, forecast_horizon = parse_forecast_query(cfg, query)
+            except ValueError as error:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+                return
+
+            model_version = query.get("version", [None])[0] or (
+                latest_versions(cfg).get(forecast_horizon)
+            )
+            if model_version is None:
+                self._send(
+                    HTTPStatus.NOT_FOUND,
+                    {"error": f"No model version for {forecast_horizon}"},
+                )
+                return
+
+            try:
+                version = load_version(model_version)
+                forecasts = forecast_ids(cfg, version, ids, forecast_horizon)
+            except FileNotFoundError:
+                self._send(
+                    HTTPStatus.NOT_FOUND,
+                    {"error": f"Unknown model version {model_version}"},
+                )
+                return
+            except KeyError as error:
+                self._send(HTTPStatus.NOT_FOUND, {"error": error.args[0]})
+                return
+            except ValueError as error:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+                return
+            except Exception:
+                logger.exception(f"Forecast of {model_version} failed")
+                self._send(
+                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                    {"error": "Internal server error"},
+                )
+                return
+
+            self._send(
+                HTTPStatus.OK,
+                {
+                    "model_version": model_version,
+                    "horizon": forecast_horizon,
+                    "forecasts": {
+                        str(id): {
+                            "dates": time_index.strftime("%Y-%m-%d").tolist(),
+                            "sales": values.tolist(),
+                        }
+                        for id, (time_index, values) in forecasts.items()
+                    },
+                },
+            )
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return ForecastHandler
+
+
+def parse_forecast_query(cfg: DictConfig, query: dict):
+    """
+    Reads the series ids and the forecast horizon of a forecast request,
+    raising ValueError for invalid values.
+    """
+    try:
+        ids = [
+            int(id)
+            for value in query.get("ids", [])
+            for id in value.split(",")
+        ]
+        forecast_horizon = int(
+            query.get("horizon", [cfg.train.forecast_horizon])[0]
+        )
+    except ValueError:
+        raise ValueError("ids and horizon must be integers")
+    if not ids:
+        raise ValueError("No ids given")
+
+    return ids, forecast_horizon
+
+
+def serve(cfg: DictConfig):
+    """
+    Serves forecasts over HTTP, keeping the most recently used model
+    versions loaded between requests.
+    """
+    load_version = version_cache(cfg, cfg.serving.cache_versions)
+    server = ThreadingHTTPServer(
+        (cfg.serving.host, cfg.serving.port),
+        make_handler(cfg, load_version),
+    )
+
+    logger.info(
+        f"Serving forecasts on http://{cfg.serving.host}:{cfg.serving.port}"
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,96 @@
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from omegaconf import DictConfig
+from src.models.predict_model import (
+    forecast,
+    load_model,
+    load_prediction_inputs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def version_cache(cfg: DictConfig, max_versions: int):
+    """
+    Returns a loader that keeps the model and the series of the
+    `max_versions` most recently used model versions in memory. Loading
+    is serialised, so concurrent requests load a version only once.
+    Versions that are not directories of the interim data path raise
+    ValueError or FileNotFoundError.
+    """
+    lock = threading.Lock()
+
+    @lru_cache(maxsize=max_versions)
+    def load(model_version: str) -> dict:
+        logger.info(f"Loading model version {model_version}.")
+        y_train, future_cov_holdout = load_prediction_inputs(
+            cfg, model_version
+        )
+
+        return {
+            "model": load_model(cfg, model_version),
+            "y_train": y_train,
+            "future_cov": future_cov_holdout,
+            "positions": {
+                int(ts.static_covariates["id"].iloc[0]): position
+                for position, ts in enumerate(y_train)
+            },
+            "max_horizon": min(len(ts) for ts in future_cov_holdout),
+            # Forecasts already served, by (id, horizon)
+            "forecasts": {},
+        }
+
+    def load_version(model_version: str) -> dict:
+        # Versions come from requests, so only plain directory names of
+        # the interim data path are loaded
+        if model_version in ("", ".", "..") or (
+            Path(model_version).name != model_version
+        ):
+            raise ValueError(f"Invalid model version {model_version!r}")
+        if not (Path(cfg.paths.interim_data_path) / model_version).is_dir():
+            raise FileNotFoundError(model_version)
+
+        with lock:
+            return load(model_version)
+
+    return load_version
+
+
+def forecast_ids(
+    cfg: DictConfig, version: dict, ids: list, forecast_horizon: int
+) -> dict:
+    """
+    Forecasts the requested series of a loaded model version. Series not
+    served before are predicted together in one batched call.
+
+    Returns a {id: (time index, values)} mapping.
+    """
+    if not 0 < forecast_horizon <= version["max_horizon"]:
+        raise ValueError(
+            f"Forecast horizon must be between 1 and {version['max_horizon']}"
+        )
+    unknown = [id for id in ids if id not in version["positions"]]
+    if unknown:
+        raise KeyError(f"Unknown series ids: {unknown}")
+
+    served = version["forecasts"]
+    missing = [id for id in ids if (id, forecast_horizon) not in served]
+    if missing:
+        positions = [version["positions"][id] for id in missing]
+        y_pred = forecast(
+            cfg,
+            version["model"],
+            n=forecast_horizon,
+            y=[version["y_train"][i] for i in positions],
+            future_cov=[version["future_cov"][i] for i in positions],
+            n_jobs=1,
+        )
+        for id, ts in zip(missing, y_pred):
+            served[(id, forecast_horizon)] = (
+                ts.time_index,
+                ts.values(copy=False)[:, 0],
+            )
+
+    return {id: served[(id, forecast_horizon)] for id in ids}
@@ -1,8 +1,10 @@
-import pickle
+import pandas as pd
 from pathlib import Path
 from omegaconf import DictConfig
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
+from src.models.artifacts import open_series_artifact, read_series_block
+from src.models.forecast_store import series_forecast_frame
 
 
 def visualize(
@@ -15,51 +17,47 @@ def visualize(
     # Construct paths to the input and output directories
     input_dir = Path(cfg.paths.interim_data_path) / model_version
 
-    # Make paths
-    y_train_path = input_dir / "y_train.pkl"
-    y_pred_path = input_dir / "y_preds.pkl"
-    y_holdout_path = input_dir / "y_holdout.pkl"
+    # Open the indexed artifacts; only the requested series is read
+    y_train = open_series_artifact(input_dir / "y_train")
+    y_pred = open_series_artifact(input_dir / "y_preds")
+    y_holdout = open_series_artifact(input_dir / "y_holdout")
 
-    with open(y_train_path, "rb") as file:
-        y_train = pickle.load(file)
+    forecast_df = series_forecast_frame(
+        read_series_block(y_train, id, last=365),
+        read_series_block(y_holdout, id),
+        read_series_block(y_pred, id),
+    )
 
-    with open(y_pred_path, "rb") as file:
-        y_pred = pickle.load(file)
+    return plot_forecast(forecast_df, show_actuals=show_actuals)
 
-    with open(y_holdout_path, "rb") as file:
-        y_holdout = pickle.load(file)
 
+def plot_forecast(forecast_df: pd.DataFrame, show_actuals=False):
+    """
+    Plots the history, forecast and optionally the actuals of one series
+    from its long forecast frame.
+    """
     # History
-    history_dates = y_train[id].time_index[-365:]
-    history_values = y_train[id].values()[-365:]
+    history = forecast_df[forecast_df["kind"] == "history"]
 
-    # Actuals (from y_valid)
-    actual_dates = y_holdout[id].time_index
-    actual_values = y_holdout[id].values()
+    # Actuals (from y_holdout)
+    actual = forecast_df[forecast_df["kind"] == "actual"]
 
     # Forecasts (from y_pred)
-    forecast_dates = y_pred[id].time_index
-    forecast_values = y_pred[id].values()
+    forecast = forecast_df[forecast_df["kind"] == "forecast"]
 
     # Initialize figure with subplots
     fig = make_subplots(specs=[[{"secondary_y": False}]])
     fig.add_trace(
-        go.Scatter(
-            x=history_dates, y=history_values.flatten(), name="History"
-        ),
+        go.Scatter(x=history["date"], y=history["sales"], name="History"),
         secondary_y=False,
     )
     if show_actuals:
         fig.add_trace(
-            go.Scatter(
-                x=actual_dates, y=actual_values.flatten(), name="Actual"
-            ),
+            go.Scatter(x=actual["date"], y=actual["sales"], name="Actual"),
             secondary_y=False,
         )
     fig.add_trace(
-        go.Scatter(
-            x=forecast_dates, y=forecast_values.flatten(), name="Forecast"
-        ),
+        go.Scatter(x=forecast["date"], y=forecast["sales"], name="Forecast"),
         secondary_y=False,
     )
     fig.update_layout(title_text="Results for selected Family-Store pair")
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+from darts import TimeSeries
+
+
+def make_series(id, values, start="2017-01-01", columns=("sales",), **static):
+    """
+    Builds a daily float32 series with one component per column of
+    `values` and the series id, plus any `static` covariates.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    series = TimeSeries.from_times_and_values(
+        pd.date_range(start=start, periods=len(values), freq="D"),
+        values.reshape(len(values), -1),
+        columns=list(columns),
+    )
+    return series.with_static_covariates(
+        pd.DataFrame({"id": id, **static}, index=[0])
+    )
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from src.models.artifacts import (
+    load_series_artifact,
+    open_series_artifact,
+    read_series_block,
+    save_series_artifact,
+)
+from tests.helpers import make_series
+
+
+def test_series_artifact_reads_single_series(tmp_path):
+    series = [
+        make_series(4, np.arange(30) + 4, "2017-01-01"),
+        make_series(9, np.arange(12) + 9, "2017-01-10"),
+    ]
+    save_series_artifact(series, tmp_path / "y_train")
+
+    artifact = open_series_artifact(tmp_path / "y_train")
+    time_index, values = read_series_block(artifact, 9)
+    assert (time_index == series[1].time_index).all()
+    np.testing.assert_array_equal(values, series[1].values())
+
+    # Only the last time steps of the history
+    time_index, values = read_series_block(artifact, 4, last=5)
+    assert (time_index == series[0].time_index[-5:]).all()
+    np.testing.assert_array_equal(values, series[0].values()[-5:])
+
+
+def test_series_artifact_round_trip(tmp_path):
+    series = [
+        make_series(4.0, np.arange(30) + 4, city=2.0, cluster=13.0),
+        make_series(
+            9.0, np.arange(12) + 9, "2017-01-10", city=0.0, cluster=7.0
+        ),
+    ]
+    save_series_artifact(series, tmp_path / "y_train")
+
+    loaded = load_series_artifact(tmp_path / "y_train")
+    for ts, expected in zip(loaded, series):
+        assert ts == expected
+        assert list(ts.components) == list(expected.components)
+        pd.testing.assert_frame_equal(
+            ts.static_covariates, expected.static_covariates
+        )
+
+    # Only the requested series
+    (loaded,) = load_series_artifact(tmp_path / "y_train", ids=[9])
+    assert loaded == series[1]
+
+
+def test_series_artifact_selects_components_and_end(tmp_path):
+    series = [
+        make_series(
+            id,
+            np.arange(60).reshape(20, 3) + id,
+            columns=("onpromotion", "sales_lag_29", "dcoilwtico"),
+        )
+        for id in [0, 1]
+    ]
+    save_series_artifact(series, tmp_path / "future_cov")
+
+    loaded = load_series_artifact(
+        tmp_path / "future_cov",
+        components=["dcoilwtico", "onpromotion"],
+        end=pd.Timestamp("2017-01-10"),
+    )
+    for ts, expected in zip(loaded, series):
+        assert list(ts.components) == ["dcoilwtico", "onpromotion"]
+        assert ts == expected[["dcoilwtico", "onpromotion"]][:10]
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from darts.models import LightGBMModel
+from src.models.batch_inference import batch_forecast, predict_series
+from tests.helpers import make_series
+
+
+# Setup fixture for series of different lengths with static covariates
+# and two-component future covariates reaching past the horizon
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    lengths = [80, 65, 90, 72]
+    y = [
+        make_series(
+            id,
+            rng.gamma(2.0, 10.0, length),
+            start=pd.Timestamp("2017-01-01") + pd.Timedelta(days=90 - length),
+            cluster=id % 2,
+        )
+        for id, length in enumerate(lengths)
+    ]
+    future_cov = [
+        make_series(
+            id,
+            rng.normal(size=(100, 2)),
+            columns=("onpromotion", "dcoilwtico"),
+        )
+        for id in range(len(lengths))
+    ]
+    return y, future_cov
+
+
+@pytest.mark.parametrize(
+    "model_params",
+    [
+        dict(lags=[-1, -2, -12], lags_future_covariates=[0]),
+        dict(
+            lags=[-1, -7],
+            lags_future_covariates=[-1, 0, 2],
+            use_static_covariates=False,
+        ),
+    ],
+)
+def test_batch_forecast_matches_darts(series, model_params):
+    y, future_cov = series
+    model = LightGBMModel(**model_params, verbose=-1)
+    model.fit(series=y, future_covariates=future_cov)
+    # Forecast from series that end on different dates
+    y = [ts[: len(ts) - id] for id, ts in enumerate(y)]
+
+    result = batch_forecast(model, 7, y, future_cov)
+    expected = model.predict(n=7, series=y, future_covariates=future_cov)
+
+    for pred, reference in zip(result, expected):
+        assert (pred.time_index == reference.time_index).all()
+        assert pred.static_covariates.equals(reference.static_covariates)
+        np.testing.assert_array_equal(pred.values(), reference.values())
+
+
+def test_batch_forecast_checks_covariate_range(series):
+    y, future_cov = series
+    model = LightGBMModel(lags=[-1], lags_future_covariates=[0], verbose=-1)
+    model.fit(series=y, future_covariates=future_cov)
+
+    with pytest.raises(ValueError):
+        batch_forecast(model, 20, y, future_cov)
+
+
+def test_predict_series_falls_back_to_darts(series):
+    y, future_cov = series
+    model = LightGBMModel(
+        lags=[-1], lags_future_covariates=[0], output_chunk_length=3
+    )
+    model.fit(series=y, future_covariates=future_cov)
+
+    result = predict_series(model, 3, y, future_cov, "batch")
+    expected = model.predict(n=3, series=y, future_covariates=future_cov)
+
+    for pred, reference in zip(result, expected):
+        np.testing.assert_array_equal(pred.values(), reference.values())
+    with pytest.raises(ValueError):
+        predict_series(model, 3, y, future_cov, "numba")
@@ -1,7 +1,19 @@
 import pytest
+import numpy as np
 import pandas as pd
 from unittest.mock import MagicMock
-from src.features.build_features import date_features
+from omegaconf import OmegaConf
+from feature_engine.timeseries.forecasting import LagFeatures
+from feature_engine.timeseries.forecasting import WindowFeatures
+from src.data.storage import load_table, save_table, table_path
+from src.features.build_features import (
+    assemble_features,
+    build_features,
+    date_features,
+    lag_features,
+    statistical_features,
+    window_features,
+)
 
 
 # Setup fixture for DataFrame
@@ -39,3 +51,195 @@ def test_date_features(test_df, mock_cfg_date):
 
     # Assertions to verify the added date features
     assert "year" in result_df.columns
+
+
+# Setup fixture for a date-major multi-series DataFrame like train.csv
+@pytest.fixture
+def series_df():
+    rng = np.random.default_rng(42)
+    n_series, n_days = 4, 60
+    df = pd.DataFrame({
+        "id": np.tile(np.arange(n_series), n_days),
+        "date": np.repeat(
+            pd.date_range(start="1/1/2022", periods=n_days, freq="D"),
+            n_series,
+        ),
+        "sales": rng.gamma(2.0, 50.0, n_series * n_days).astype("float32"),
+    })
+    # Add a run of zero sales, as for closed stores
+    df.loc[df["id"] == 2, "sales"] = np.where(
+        np.arange(n_days) < 30, 0.0, df.loc[df["id"] == 2, "sales"]
+    )
+    # Drop a few rows so series have different lengths
+    return df.drop(index=[0, 5, 6, 101])
+
+
+def test_lag_features_matches_feature_engine(series_df):
+    mock_cfg = MagicMock()
+    mock_cfg.lags = [1, 6, 21]
+    forecast_horizon = 3
+
+    result_df = lag_features(series_df, mock_cfg, forecast_horizon)
+
+    # Reference: per-id feature_engine transformation
+    lag_it = LagFeatures(periods=[4, 9, 24], drop_original=True)
+    expected_df = pd.concat(
+        lag_it.fit_transform(group[["sales"]])
+        for _, group in series_df.groupby("id")
+    )
+
+    pd.testing.assert_frame_equal(result_df, expected_df)
+
+
+# Setup fixture for hundreds of long series of very different scales,
+# in the same date-major layout
+@pytest.fixture
+def wide_series_df():
+    rng = np.random.default_rng(7)
+    n_series, n_days = 400, 400
+    scales = 10 ** rng.uniform(-2, 4, n_series)
+    return pd.DataFrame({
+        "id": np.tile(np.arange(n_series), n_days),
+        "date": np.repeat(
+            pd.date_range(start="1/1/2022", periods=n_days, freq="D"),
+            n_series,
+        ),
+        "sales": (
+            rng.gamma(2.0, 1.0, (n_days, n_series)) * scales
+        ).ravel().astype("float32"),
+    })
+
+
+@pytest.mark.parametrize("data", ["series_df", "wide_series_df"])
+def test_window_features_matches_feature_engine(data, request):
+    data_df = request.getfixturevalue(data)
+    mock_cfg = MagicMock()
+    mock_cfg.windows = [2, 5, 30, 116]
+    mock_cfg.functions = ["mean", "max", "std"]
+    forecast_horizon = 3
+
+    result_df = window_features(data_df, mock_cfg, forecast_horizon)
+
+    # Reference: per-id feature_engine transformation
+    roll_it = WindowFeatures(
+        window=[5, 8, 33, 119], functions=["mean", "max", "std"],
+        drop_original=True,
+    )
+    expected_df = pd.concat(
+        roll_it.fit_transform(group[["sales"]])
+        for _, group in data_df.groupby("id")
+    )
+
+    pd.testing.assert_frame_equal(
+        result_df, expected_df, check_dtype=False, rtol=1e-5
+    )
+
+
+def test_statistical_features_native_matches_tsfresh(series_df):
+    cfg = OmegaConf.load("config/config.yaml")
+    native_cfg = cfg.build_features.statistical_features
+    tsfresh_cfg = OmegaConf.merge(
+        native_cfg,
+        OmegaConf.create(
+            {"execution": {"mode": "serial", "native_fast_path": False}}
+        ),
+    )
+
+    result_df = statistical_features(series_df, native_cfg)
+    expected_df = statistical_features(series_df, tsfresh_cfg)
+
+    assert len(result_df.columns) == 12
+    pd.testing.assert_frame_equal(
+        result_df, expected_df, check_dtype=False, rtol=1e-5
+    )
+
+
+def test_assemble_features_matches_merge_and_dropna(series_df):
+    lag_cfg = OmegaConf.create({"lags": [1, 6]})
+    window_cfg = OmegaConf.create({"windows": [2, 5], "functions": ["mean"]})
+    forecast_horizon = 3
+    # A missing input value and a series without statistical features
+    series_df.loc[50, "sales"] = np.nan
+    statistical_df = pd.DataFrame({
+        "id": [3, 0, 1],
+        "sales__mean": np.array([1.0, 2.0, np.nan], dtype="float32"),
+    })
+
+    lagged_df = lag_features(series_df, lag_cfg, forecast_horizon)
+    window_df = window_features(series_df, window_cfg, forecast_horizon)
+    result_df = assemble_features(
+        series_df, statistical_df, [lagged_df, window_df], max_offset=8
+    )
+
+    expected_df = (
+        series_df.assign(
+            sales__mean=series_df["id"].map(
+                statistical_df.set_index("id")["sales__mean"]
+            )
+        )
+        .join(lagged_df)
+        .join(window_df)
+        .dropna()
+    )
+    pd.testing.assert_frame_equal(result_df, expected_df)
+
+
+def test_streaming_build_matches_in_memory_build(series_df, tmp_path):
+    cfg = OmegaConf.load("config/config.yaml")
+    cfg.build_features.statistical_features.execution.mode = "serial"
+    cfg.build_features.lag_features.lags = [1, 6]
+    cfg.build_features.window_features.windows = [2, 5]
+    cfg.paths.processed_data_path = str(tmp_path / "processed")
+    (tmp_path / "processed").mkdir()
+    save_table(
+        series_df.assign(onpromotion=np.uint32(0), city=1),
+        table_path(tmp_path / "processed", "train", cfg.paths.storage),
+        cfg.paths.storage,
+    )
+
+    results = []
+    for streaming in [False, True]:
+        cfg.build_features.streaming.enabled = streaming
+        # A tiny budget, so every series becomes its own partition
+        cfg.build_features.streaming.memory_budget_mb = 0.001
+        cfg.paths.interim_data_path = str(tmp_path / f"interim_{streaming}")
+        model_version = build_features(cfg, forecast_horizon=3)
+        output_dir = tmp_path / f"interim_{streaming}" / model_version
+        results.append(
+            load_table(table_path(output_dir, "train", cfg.paths.storage))
+            .sort_values(["id", "date"])
+            .reset_index(drop=True)
+        )
+
+    pd.testing.assert_frame_equal(results[1], results[0])
+
+
+def test_date_features_match_row_accessors():
+    dates = pd.Series(
+        np.repeat(pd.date_range("2015-12-20", "2017-01-10", freq="D"), 3)
+    )
+    cfg = OmegaConf.load("config/config.yaml").build_features.date_features
+
+    result_df = date_features(pd.DataFrame({"date": dates}), cfg)
+
+    earthquake_week = dates.between("2016-04-11", "2016-04-17")
+    expected_df = pd.DataFrame(
+        {
+            "date": dates,
+            "year": dates.dt.year,
+            "quarter": dates.dt.quarter,
+            "month": dates.dt.month,
+            "week": dates.dt.isocalendar().week,
+            "day_of_week": dates.dt.dayofweek,
+            "day_of_month": dates.dt.day,
+            "day_of_year": dates.dt.dayofyear,
+            "is_weekend": (dates.dt.dayofweek >= 5).astype(int),
+            "is_month_end": dates.dt.is_month_end.astype(int),
+            "is_payroll": (dates.dt.day == 15).astype(int),
+            "is_earthquake": earthquake_week.astype(int),
+        }
+    )
+
+    pd.testing.assert_frame_equal(result_df, expected_df, check_dtype=False)
+    itemsizes = result_df.drop(columns="date").dtypes.map(lambda d: d.itemsize)
+    assert (itemsizes <= 2).all()
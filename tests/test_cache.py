@@ -0,0 +1,51 @@
+from src.pipeline.cache import evict, lookup, record, stage_key
+
+
+def test_stage_key_follows_inputs_and_config(tmp_path):
+    index = {"entries": {}, "fingerprints": {}}
+    source = tmp_path / "train.csv"
+    source.write_text("date,sales\n2017-08-15,1.0\n")
+
+    key = stage_key("make_dataset", [source], {"fillna": "backfill"}, index)
+    assert key == stage_key(
+        "make_dataset", [source], {"fillna": "backfill"}, index
+    )
+    assert key != stage_key(
+        "make_dataset", [source], {"fillna": "ffill"}, index
+    )
+
+    source.write_text("date,sales\n2017-08-15,2.0\n")
+    assert key != stage_key(
+        "make_dataset", [source], {"fillna": "backfill"}, index
+    )
+
+
+def test_lookup_and_evict(tmp_path):
+    index = {"entries": {}, "fingerprints": {}}
+    interim_dir, model_dir = tmp_path / "interim", tmp_path / "models"
+    model_dir.mkdir()
+    for version in ["v1", "v2", "v3", "v4"]:
+        (interim_dir / version).mkdir(parents=True)
+        (interim_dir / version / "y_preds.pkl").write_bytes(b"0" * 100)
+        record(
+            index, version, "predict_model", None,
+            [interim_dir / version / "y_preds.pkl"], model_version=version,
+        )
+
+    # Looking up v1 makes it the most recently used, so the order from
+    # least to most recently used is v2, v3, v4, v1
+    for used, version in enumerate(["v2", "v3", "v4"]):
+        index["entries"][version]["last_used"] = used
+    assert lookup(index, "v1") is not None
+
+    # v2 is kept, e.g. as a served version, so v3 is evicted first
+    evict(index, interim_dir, model_dir, max_bytes=300, keep={"v2"})
+    assert [version.name for version in sorted(interim_dir.iterdir())] == [
+        "v1", "v2", "v4",
+    ]
+    assert lookup(index, "v3") is None
+
+    evict(index, interim_dir, model_dir, max_bytes=200, keep={"v2"})
+    assert not (interim_dir / "v4").exists()
+    assert lookup(index, "v1") is not None
+    assert lookup(index, "v2") is not None
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+import pandas as pd
+from omegaconf import OmegaConf
+from src.data.dtypes import compact_dtypes
+
+
+# Setup fixture for the dtype policy section of the config
+@pytest.fixture
+def dtypes_cfg():
+    return OmegaConf.load("config/config.yaml").dtypes
+
+
+def test_compact_dtypes_narrows_columns(dtypes_cfg):
+    data = pd.DataFrame({
+        "id": np.array([0, 300, 2], dtype=np.int64),
+        "code": np.array([-1, 5, 2], dtype=np.int64),
+        "onpromotion": np.array([0, 3, 250], dtype=np.uint32),
+        "mean": np.array([1.5, 2.25, 0.0], dtype=np.float64),
+        "store_nbr": ["1", "1", "1"],
+        "name": ["a", "b", "c"],
+    })
+
+    report = compact_dtypes(data, dtypes_cfg)
+
+    assert data.dtypes.astype(str).tolist() == [
+        "int16", "int8", "uint8", "float32", "category", "object"
+    ]
+    assert data["id"].tolist() == [0, 300, 2]
+    assert data["code"].tolist() == [-1, 5, 2]
+    assert data["mean"].tolist() == [1.5, 2.25, 0.0]
+    assert data.columns.name is None
+
+    assert report.loc["id", "dtype_before"] == "int64"
+    assert report.loc["id", "mb_saved"] == pytest.approx(3 * 6 / 2**20)
+    assert report.loc["name", "mb_saved"] == 0
+
+
+def test_compact_dtypes_keeps_integers_of_partitions(dtypes_cfg):
+    data = pd.DataFrame({
+        "id": np.array([0, 1], dtype=np.int64),
+        "mean": np.array([1.0, 2.0], dtype=np.float64),
+    })
+
+    compact_dtypes(data, dtypes_cfg, integers=False)
+
+    assert data.dtypes.astype(str).tolist() == ["int64", "float32"]
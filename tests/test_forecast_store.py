@@ -0,0 +1,67 @@
+import numpy as np
+from omegaconf import OmegaConf
+from src.models.artifacts import save_series_artifact
+from src.models.forecast_store import (
+    forecasts_path,
+    latest_versions,
+    open_forecasts,
+    read_series_forecast,
+    save_forecasts,
+)
+from tests.helpers import make_series
+
+
+def test_shorter_horizons_are_served_from_one_prediction(tmp_path):
+    cfg = OmegaConf.create(
+        {
+            "paths": {
+                "interim_data_path": str(tmp_path / "interim"),
+                "forecast_store_path": str(tmp_path / "forecasts"),
+            },
+            "forecast_store": {"history_days": 30},
+        }
+    )
+    version_dir = tmp_path / "interim" / "v1"
+    for name, start, length in [
+        ("y_train", "2017-01-01", 100),
+        ("y_holdout", "2017-04-11", 42),
+        ("y_preds", "2017-04-11", 42),
+    ]:
+        save_series_artifact(
+            [make_series(id, np.arange(length) + id, start) for id in [0, 1]],
+            version_dir / name,
+        )
+
+    for forecast_horizon in [28, 42]:
+        save_forecasts(cfg, forecast_horizon, "v1")
+
+    assert latest_versions(cfg) == {28: "v1", 42: "v1"}
+    for forecast_horizon in [28, 42]:
+        forecasts = open_forecasts(forecasts_path(cfg, forecast_horizon, "v1"))
+        frame = read_series_forecast(forecasts, 1)
+        counts = frame["kind"].value_counts()
+        assert counts["history"] == 30
+        assert counts["actual"] == forecast_horizon
+        assert counts["forecast"] == forecast_horizon
+
+
+def test_empty_prediction_stores_an_empty_table(tmp_path):
+    cfg = OmegaConf.create(
+        {
+            "paths": {
+                "interim_data_path": str(tmp_path / "interim"),
+                "forecast_store_path": str(tmp_path / "forecasts"),
+            },
+            "forecast_store": {"history_days": 30},
+        }
+    )
+    for name in ["y_train", "y_holdout", "y_preds"]:
+        save_series_artifact([], tmp_path / "interim" / "v1" / name)
+
+    save_forecasts(cfg, 28, "v1")
+
+    assert latest_versions(cfg) == {28: "v1"}
+    parquet_file, row_groups = open_forecasts(forecasts_path(cfg, 28, "v1"))
+    assert parquet_file.metadata.num_rows == 0
+    assert parquet_file.schema_arrow.names == ["id", "kind", "date", "sales"]
+    assert row_groups == {}
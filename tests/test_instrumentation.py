@@ -0,0 +1,37 @@
+import json
+from omegaconf import OmegaConf
+from src.pipeline.instrumentation import finish_run, start_run, step
+
+
+def test_run_report_nests_and_sums_steps(tmp_path):
+    start_run(OmegaConf.create({"enabled": True, "profile_stage": "stage"}))
+
+    with step("stage") as measurement:
+        for rows in [10, 20]:
+            with step("partition") as partition:
+                partition["rows_out"] = rows
+        measurement["cached"] = False
+
+    report_path = finish_run(tmp_path)
+    with open(report_path) as file:
+        steps = {record["step"]: record for record in json.load(file)["steps"]}
+
+    assert set(steps) == {"stage", "stage/partition"}
+    assert steps["stage/partition"]["calls"] == 2
+    assert steps["stage/partition"]["rows_out"] == 30
+    assert steps["stage"]["cached"] is False
+    assert steps["stage"]["wall_seconds"] >= 0
+    assert steps["stage"]["peak_rss_mb"] > 0
+    assert len(list(tmp_path.glob("profile_stage_*.prof"))) == 1
+
+    # A rerun of the same version keeps the earlier report
+    start_run(OmegaConf.create({"enabled": True, "profile_stage": None}))
+    with step("stage"):
+        pass
+    assert finish_run(tmp_path) != report_path
+    assert report_path.exists()
+
+    # Outside of a run nothing is recorded
+    with step("stage") as measurement:
+        measurement["rows_out"] = 1
+    assert finish_run(tmp_path) is None
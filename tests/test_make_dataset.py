@@ -0,0 +1,109 @@
+import shutil
+import pytest
+import numpy as np
+import pandas as pd
+from omegaconf import OmegaConf
+from src.data.encoders import encode_column
+from src.data.make_dataset import make_dataset
+from src.data.series_ids import assign_series_ids
+from src.data.storage import load_table
+
+
+# Setup fixture for a config pointing at a small copy of the raw data
+@pytest.fixture
+def tmp_cfg(tmp_path):
+    for directory in ["raw", "external", "processed"]:
+        (tmp_path / directory).mkdir()
+    shutil.copy("data/raw/stores.csv", tmp_path / "raw")
+    shutil.copy("data/raw/transactions.csv", tmp_path / "raw")
+    shutil.copy("data/external/oil.csv", tmp_path / "external")
+    shutil.copy("data/external/holidays_events.csv", tmp_path / "external")
+
+    cfg = OmegaConf.load("config/config.yaml")
+    cfg.paths.input_data_path = str(tmp_path / "raw")
+    cfg.paths.external_data_path = str(tmp_path / "external")
+    cfg.paths.processed_data_path = str(tmp_path / "processed")
+    return cfg
+
+
+# Setup fixture for date-ordered raw sales in the train.csv schema
+@pytest.fixture
+def raw_sales():
+    rng = np.random.default_rng(0)
+    df = pd.MultiIndex.from_product(
+        [
+            pd.date_range("2017-07-01", "2017-08-15").strftime("%Y-%m-%d"),
+            [1, 2, 3],
+            ["GROCERY I", "DAIRY", "AUTOMOTIVE"],
+        ],
+        names=["date", "store_nbr", "family"],
+    ).to_frame(index=False)
+    df["sales"] = rng.gamma(2.0, 50.0, len(df)).round(2)
+    df["onpromotion"] = rng.integers(0, 5, len(df))
+    df.insert(0, "id", range(len(df)))
+    return df
+
+
+# The oil prices either cover every sales date or lag behind the history
+@pytest.mark.parametrize("oil_end", [None, "2017-08-09"])
+def test_incremental_matches_full_rebuild(tmp_cfg, raw_sales, oil_end):
+    raw_path = f"{tmp_cfg.paths.input_data_path}/train.csv"
+    oil_path = f"{tmp_cfg.paths.external_data_path}/oil.csv"
+    processed_path = f"{tmp_cfg.paths.processed_data_path}/train.parquet"
+    tmp_cfg.make_dataset.incremental = True
+    oil = pd.read_csv(oil_path)
+
+    # Ingest the history, then two daily appends that extend oil.csv
+    raw_sales[raw_sales["date"] <= "2017-08-13"].to_csv(raw_path, index=False)
+    if oil_end:
+        oil[oil["date"] <= oil_end].to_csv(oil_path, index=False)
+    make_dataset(tmp_cfg)
+    for day in ["2017-08-14", "2017-08-15"]:
+        raw_sales[raw_sales["date"] == day].to_csv(
+            raw_path, mode="a", header=False, index=False
+        )
+        oil.to_csv(oil_path, index=False)
+        make_dataset(tmp_cfg)
+    incremental_df = load_table(processed_path)
+
+    tmp_cfg.make_dataset.incremental = False
+    make_dataset(tmp_cfg)
+    full_df = load_table(processed_path)
+
+    pd.testing.assert_frame_equal(incremental_df, full_df)
+
+
+def test_assign_series_ids_keeps_known_ids():
+    group_by = ["store_nbr", "family"]
+    data = pd.DataFrame({
+        "store_nbr": pd.Categorical(["1", "2", "1", "2"]),
+        "family": ["DAIRY", "DAIRY", "BREAD/BAKERY", "DAIRY"],
+    })
+    empty_ids = pd.DataFrame(columns=["id"] + group_by).astype({"id": int})
+
+    ids, series_ids = assign_series_ids(data, group_by, empty_ids)
+    assert ids.tolist() == [1, 2, 0, 2]
+
+    # A new combination is appended, known ones keep their ids
+    new_data = pd.DataFrame({
+        "store_nbr": pd.Categorical(["3", "2"]),
+        "family": ["DAIRY", "DAIRY"],
+    })
+    new_ids, series_ids = assign_series_ids(new_data, group_by, series_ids)
+    assert new_ids.tolist() == [3, 2]
+    assert series_ids.loc[3, group_by].tolist() == ["3", "DAIRY"]
+
+
+def test_encode_column_appends_unseen_values():
+    codes, vocabulary = encode_column(
+        pd.Series(["Quito", "Cuenca", "Quito"], dtype="category"), []
+    )
+    assert codes.tolist() == [1, 0, 1]
+    assert vocabulary == ["Cuenca", "Quito"]
+
+    # Known values keep their codes without a refit
+    codes, vocabulary = encode_column(
+        pd.Series(["Quito", "Ambato", "Guayaquil"]), vocabulary
+    )
+    assert codes.tolist() == [1, 2, 3]
+    assert vocabulary == ["Cuenca", "Quito", "Ambato", "Guayaquil"]
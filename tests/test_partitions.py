@@ -0,0 +1,29 @@
+import numpy as np
+from src.models.partitions import fit_partitions, predict_partitions
+from tests.helpers import make_series
+
+
+def test_partitioned_predictions_follow_series_order():
+    rng = np.random.default_rng(0)
+    ids = [3, 0, 2, 1]
+    labels = {0: "a", 1: "b", 2: "a", 3: "b"}
+    y = [make_series(id, rng.gamma(2.0, 10.0, 80)) for id in ids]
+    future_cov = [
+        make_series(id, rng.normal(size=90)).with_columns_renamed(
+            "sales", "onpromotion"
+        )
+        for id in ids
+    ]
+    model_params = dict(lags=[-1, -2], lags_future_covariates=[0], verbose=-1)
+
+    models = fit_partitions(y, future_cov, labels, model_params, n_jobs=2)
+    y_pred = predict_partitions(models, 5, y, future_cov, labels, n_jobs=2)
+
+    assert set(models) == {"a", "b"}
+    for ts, pred, cov in zip(y, y_pred, future_cov):
+        id = int(ts.static_covariates["id"].iloc[0])
+        assert int(pred.static_covariates["id"].iloc[0]) == id
+        expected = models[labels[id]].predict(
+            n=5, series=ts, future_covariates=cov
+        )
+        np.testing.assert_allclose(pred.values(), expected.values())
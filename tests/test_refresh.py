@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+from src.models.partitions import fit_partitions
+from src.models.refresh import (
+    refresh_base,
+    save_refresh_state,
+    target_reference,
+)
+from tests.helpers import make_series
+
+
+# Setup fixture for the refresh config with an earlier full fit on disk
+@pytest.fixture
+def refresh_env(tmp_path):
+    cfg = OmegaConf.load("config/config.yaml").train.refresh
+    cfg.enabled = True
+    cfg.full_fit_every = 2
+    interim_dir, model_dir = tmp_path / "interim", tmp_path / "models"
+    model_dir.mkdir()
+    for version in ["v1", "v2"]:
+        (interim_dir / version).mkdir(parents=True)
+        (model_dir / f"model_{version}.pkl").touch()
+    reference = {"mean": 10.0, "std": 2.0}
+    save_refresh_state(interim_dir / "v1", "v1", "sig", reference)
+    return cfg, interim_dir, model_dir, reference
+
+
+def test_refresh_base_follows_schedule_and_drift(refresh_env):
+    cfg, interim_dir, model_dir, reference = refresh_env
+
+    base = refresh_base(cfg, interim_dir, model_dir, "v2", "sig", reference)
+    assert base["version"] == "v1"
+    save_refresh_state(interim_dir / "v2", "v2", "sig", reference, base)
+
+    # The second refresh is allowed, after it a full fit is due
+    base = refresh_base(cfg, interim_dir, model_dir, "v3", "sig", reference)
+    assert (base["version"], base["refreshes"]) == ("v2", 1)
+    assert base["full_fit_version"] == "v1"
+    save_refresh_state(interim_dir / "v2", "v2", "sig", reference, base)
+    assert refresh_base(
+        cfg, interim_dir, model_dir, "v3", "sig", reference
+    ) is None
+
+
+def test_refresh_base_skips_other_signatures(refresh_env):
+    cfg, interim_dir, model_dir, reference = refresh_env
+
+    # A later version of another forecast horizon does not hide v1
+    save_refresh_state(interim_dir / "v2", "v2", "other", reference)
+    base = refresh_base(cfg, interim_dir, model_dir, "v3", "sig", reference)
+    assert base["version"] == "v1"
+    base = refresh_base(cfg, interim_dir, model_dir, "v3", "other", reference)
+    assert base["version"] == "v2"
+
+
+def test_refresh_base_fits_from_scratch(refresh_env):
+    cfg, interim_dir, model_dir, reference = refresh_env
+
+    # Changed features, drifted target, later versions and missing models
+    assert refresh_base(
+        cfg, interim_dir, model_dir, "v2", "other", reference
+    ) is None
+    drifted = {"mean": 10.0 + 2.0 * (cfg.drift_threshold + 0.1), "std": 2.0}
+    assert refresh_base(
+        cfg, interim_dir, model_dir, "v2", "sig", drifted
+    ) is None
+    assert refresh_base(
+        cfg, interim_dir, model_dir, "v0", "sig", reference
+    ) is None
+    (model_dir / "model_v1.pkl").unlink()
+    assert refresh_base(
+        cfg, interim_dir, model_dir, "v2", "sig", reference
+    ) is None
+
+
+def test_refreshed_partitions_continue_boosting():
+    y = [make_series(id, np.arange(60) % 7 + id) for id in [0, 1]]
+    future_cov = [
+        make_series(id, np.arange(70) % 5, columns=("onpromotion",))
+        for id in [0, 1]
+    ]
+    labels = {0: "a", 1: "b"}
+    model_params = dict(
+        lags=[-1, -2], lags_future_covariates=[0], n_estimators=10,
+        min_child_samples=5, verbose=-1,
+    )
+    models = fit_partitions(y, future_cov, labels, model_params, n_jobs=2)
+
+    refreshed = fit_partitions(
+        [ts[-30:] for ts in y],
+        future_cov,
+        labels,
+        {**model_params, "n_estimators": 3},
+        n_jobs=2,
+        init_models={"a": models["a"]},
+    )
+
+    trees = {
+        label: model.model.booster_.num_trees()
+        for label, model in refreshed.items()
+    }
+    assert trees == {"a": 13, "b": 3}
+    assert target_reference(y, 7)["mean"] == pytest.approx(3.5)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+from src.models.series_builder import build_series_groups
+
+
+@pytest.fixture
+def feature_df():
+    rng = np.random.default_rng(0)
+    frames = []
+    for id, (start, periods) in enumerate(
+        [("2017-01-01", 60), ("2017-01-15", 46), ("2017-01-03", 58)]
+    ):
+        dates = pd.date_range(start=start, periods=periods, freq="D")
+        frame = pd.DataFrame(
+            {
+                "id": id,
+                "date": dates,
+                "sales": rng.gamma(2.0, 10.0, periods).astype(np.float32),
+                "onpromotion": rng.integers(0, 5, periods).astype(np.float32),
+                "dcoilwtico": rng.normal(50, 5, periods).astype(np.float32),
+                "city": id % 2,
+                "cluster": 10 + id,
+            }
+        )
+        frame.loc[frame.index[::7], "dcoilwtico"] = np.nan
+        # Drop a few days to check that missing dates are filled
+        frames.append(frame.drop(frame.index[[5, 20]]))
+
+    return pd.concat(frames).sample(frac=1, random_state=0)
+
+
+def test_build_series_groups_matches_from_group_dataframe(feature_df):
+    value_cols = {"y": ["sales"], "future_cov": ["onpromotion", "dcoilwtico"]}
+    static_cols = ["city", "cluster"]
+    cutoff_date = pd.Timestamp("2017-02-20")
+
+    groups = build_series_groups(
+        feature_df, value_cols, static_cols, cutoff_date
+    )
+
+    splits = [
+        feature_df[feature_df["date"] <= cutoff_date],
+        feature_df[feature_df["date"] > cutoff_date],
+    ]
+    for name, cols in value_cols.items():
+        for split, split_df in enumerate(splits):
+            expected = TimeSeries.from_group_dataframe(
+                split_df,
+                group_cols="id",
+                time_col="date",
+                static_cols=static_cols,
+                value_cols=cols,
+                fill_missing_dates=True,
+                freq="D",
+                fillna_value=0,
+            )
+            result = groups[name][split]
+
+            assert len(result) == len(expected)
+            for ts, expected_ts in zip(result, expected):
+                assert (ts.time_index == expected_ts.time_index).all()
+                assert list(ts.components) == list(expected_ts.components)
+                np.testing.assert_allclose(
+                    ts.values(), expected_ts.values(), rtol=1e-6
+                )
+                pd.testing.assert_frame_equal(
+                    ts.static_covariates,
+                    expected_ts.static_covariates,
+                    check_dtype=False,
+                )
@@ -0,0 +1,160 @@
+import json
+import pickle
+import shutil
+import threading
+import numpy as np
+import pytest
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+from pathlib import Path
+from darts.models import LightGBMModel
+from omegaconf import OmegaConf
+from src.models.artifacts import save_series_artifact
+from src.serving.server import make_handler
+from src.serving.service import forecast_ids, version_cache
+from tests.helpers import make_series
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    rng = np.random.default_rng(0)
+    y_train = [make_series(id, rng.gamma(2.0, 10.0, 60)) for id in range(3)]
+    future_cov_holdout = [
+        make_series(
+            id, rng.normal(size=7), "2017-03-02", columns=("onpromotion",)
+        )
+        for id in range(3)
+    ]
+    model = LightGBMModel(lags=[-1, -2], lags_future_covariates=[0])
+    model.fit(
+        series=y_train,
+        future_covariates=[
+            make_series(id, rng.normal(size=67), columns=("onpromotion",))
+            for id in range(3)
+        ],
+    )
+
+    version_dir = tmp_path / "interim" / "v1"
+    save_series_artifact(y_train, version_dir / "y_train")
+    save_series_artifact(
+        future_cov_holdout, version_dir / "future_cov_holdout"
+    )
+    (tmp_path / "models").mkdir()
+    model.save(str(tmp_path / "models" / "model_v1.pkl"))
+
+    return OmegaConf.create(
+        {
+            "paths": {
+                "interim_data_path": str(tmp_path / "interim"),
+                "model_save_path": str(tmp_path / "models"),
+                "forecast_store_path": str(tmp_path / "forecasts"),
+            },
+            "train": {"forecast_horizon": 7, "partition": {"by": None}},
+            "predict": {"engine": "batch"},
+        }
+    )
+
+
+# Setup fixture for a server on a free port, answering with the config
+@pytest.fixture
+def server_url(cfg):
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(cfg, version_cache(cfg, 2))
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    try:
+        with urlopen(url) as response:
+            return response.status, json.load(response)
+    except HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_forecast_ids_matches_batch_predictions(cfg):
+    load_version = version_cache(cfg, max_versions=2)
+    version = load_version("v1")
+    assert load_version("v1") is version
+
+    expected = version["model"].predict(
+        n=7, series=version["y_train"], future_covariates=version["future_cov"]
+    )
+    forecasts = forecast_ids(cfg, version, [2, 0], 7)
+    for id in [2, 0]:
+        time_index, values = forecasts[id]
+        assert (time_index == expected[id].time_index).all()
+        np.testing.assert_allclose(values, expected[id].values()[:, 0])
+
+    with pytest.raises(KeyError):
+        forecast_ids(cfg, version, [5], 7)
+    with pytest.raises(ValueError):
+        forecast_ids(cfg, version, [0], 8)
+
+
+def test_load_version_detects_partitioned_models(cfg):
+    # A version trained with partition.by, served with partition.by unset
+    model_dir = Path(cfg.paths.model_save_path)
+    interim_dir = Path(cfg.paths.interim_data_path)
+    shutil.copytree(interim_dir / "v1", interim_dir / "v2")
+    with open(model_dir / "model_v1.pkl", "rb") as file:
+        model = pickle.load(file)
+    with open(model_dir / "model_v2.pkl", "wb") as file:
+        pickle.dump(
+            {
+                "labels": {0: "a", 1: "b", 2: "a"},
+                "models": {"a": model, "b": model},
+            },
+            file,
+        )
+
+    load_version = version_cache(cfg, max_versions=2)
+    expected = forecast_ids(cfg, load_version("v1"), [0, 1], 7)
+    forecasts = forecast_ids(cfg, load_version("v2"), [0, 1], 7)
+    for id in [0, 1]:
+        np.testing.assert_allclose(forecasts[id][1], expected[id][1])
+
+
+def test_server_answers_forecast_requests(cfg, server_url):
+    assert get(f"{server_url}/health") == (200, {"status": "ok"})
+    assert get(f"{server_url}/unknown")[0] == 404
+
+    # Without latest.json there is no default version
+    assert get(f"{server_url}/forecast?ids=0")[0] == 404
+    forecast_store = Path(cfg.paths.forecast_store_path)
+    forecast_store.mkdir()
+    (forecast_store / "latest.json").write_text(json.dumps({"7": "v1"}))
+
+    # The default horizon is served by the latest version
+    status, body = get(f"{server_url}/forecast?ids=2,0&ids=1")
+    assert status == 200
+    assert (body["model_version"], body["horizon"]) == ("v1", 7)
+    assert list(body["forecasts"]) == ["2", "0", "1"]
+
+    status, body = get(f"{server_url}/forecast?ids=2&horizon=5&version=v1")
+    assert status == 200
+    expected = forecast_ids(cfg, version_cache(cfg, 1)("v1"), [2], 5)[2]
+    assert body["forecasts"]["2"]["dates"] == (
+        expected[0].strftime("%Y-%m-%d").tolist()
+    )
+    np.testing.assert_allclose(
+        body["forecasts"]["2"]["sales"], expected[1], rtol=1e-6
+    )
+
+    # Invalid requests, unknown ids and unknown versions
+    for query, status in [
+        ("ids=a", 400),
+        ("", 400),
+        ("ids=0&horizon=8&version=v1", 400),
+        ("ids=9", 404),
+        ("ids=0&version=v9", 404),
+        ("ids=0&version=..", 400),
+        ("ids=0&version=../interim/v1", 400),
+        ("ids=0&version=/etc", 400),
+    ]:
+        assert get(f"{server_url}/forecast?{query}")[0] == status
@@ -0,0 +1,71 @@
+import pytest
+import pandas as pd
+from omegaconf import OmegaConf
+from src.data.storage import (
+    load_table,
+    numeric_columns,
+    save_table,
+    split_table_rows,
+    table_path,
+    table_schema,
+)
+
+
+# Setup fixture for a DataFrame with the dtypes make_dataset produces
+@pytest.fixture
+def test_df():
+    df = pd.DataFrame({
+        "store_nbr": pd.Categorical(["1", "2", "1"]),
+        "date": pd.date_range(start="1/1/2022", periods=3, freq="D"),
+        "sales": pd.Series([1.5, 2.0, 0.0], dtype="float32"),
+        "onpromotion": pd.Series([0, 3, 1], dtype="uint32"),
+    }, index=[4, 7, 9])
+    return df
+
+
+@pytest.mark.parametrize("storage_format", ["parquet", "feather"])
+def test_table_round_trip_keeps_dtypes(tmp_path, test_df, storage_format):
+    cfg = OmegaConf.create(
+        {"format": storage_format, "compression": "zstd"}
+    )
+    path = table_path(tmp_path, "train", cfg)
+
+    save_table(test_df, path, cfg)
+    result_df = load_table(path)
+
+    pd.testing.assert_frame_equal(result_df, test_df.reset_index(drop=True))
+
+
+def test_load_table_projects_columns(tmp_path, test_df):
+    cfg = OmegaConf.create({"format": "parquet", "compression": "zstd"})
+    path = table_path(tmp_path, "train", cfg)
+    save_table(test_df, path, cfg)
+
+    result_df = load_table(path, columns=["date", "sales"])
+
+    assert list(result_df.columns) == ["date", "sales"]
+    assert numeric_columns(table_schema(path)) == ["sales", "onpromotion"]
+
+
+@pytest.mark.parametrize("storage_format", ["parquet", "feather"])
+def test_split_table_rows_by_label(tmp_path, storage_format):
+    cfg = OmegaConf.create(
+        {"format": storage_format, "compression": "zstd"}
+    )
+    path = table_path(tmp_path, "train", cfg)
+    df = pd.DataFrame({
+        "id": [0, 3, 1, 2, 0, 3, 1, 2],
+        "sales": pd.Series(range(8), dtype="float32"),
+    })
+    save_table(df, path, cfg)
+
+    # Series 0 has no label and is dropped
+    labels = pd.Series([1, 0, 1], index=[1, 2, 3])
+    paths = split_table_rows(path, "id", labels, tmp_path, cfg)
+
+    assert sorted(paths) == [0, 1]
+    for label, ids in [(0, [2]), (1, [1, 3])]:
+        pd.testing.assert_frame_equal(
+            load_table(paths[label]),
+            df[df["id"].isin(ids)].reset_index(drop=True),
+        )
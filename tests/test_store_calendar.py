@@ -0,0 +1,69 @@
+import pytest
+import pandas as pd
+from src.data.store_calendar import (
+    join_store_calendar,
+    read_holidays,
+    store_calendar,
+)
+
+
+# Setup fixture for two stores in different cities and states
+@pytest.fixture
+def stores_df():
+    return pd.DataFrame({
+        "store_nbr": pd.Categorical(["1", "3"]),
+        "city": pd.Categorical(["Quito", "Cuenca"]),
+        "state": pd.Categorical(["Pichincha", "Azuay"]),
+    })
+
+
+def test_store_calendar_resolves_holidays(tmp_path, stores_df):
+    holidays_path = tmp_path / "holidays_events.csv"
+    pd.DataFrame(
+        [
+            ["2017-01-02", "Holiday", "National", "Ecuador", False],
+            ["2017-01-03", "Holiday", "Regional", "Azuay", False],
+            ["2017-01-04", "Holiday", "Local", "Quito", False],
+            # Moved from the 5th and celebrated on the 6th
+            ["2017-01-05", "Holiday", "Local", "Cuenca", True],
+            ["2017-01-06", "Transfer", "Local", "Cuenca", False],
+            ["2017-01-07", "Event", "National", "Ecuador", False],
+            ["2017-01-08", "Work Day", "National", "Ecuador", False],
+        ],
+        columns=["date", "type", "locale", "locale_name", "transferred"],
+    ).assign(description="").to_csv(holidays_path, index=False)
+    transactions_df = pd.DataFrame({
+        "date": pd.PeriodIndex(["2017-01-02", "2017-01-04"], freq="D"),
+        "store_nbr": [3, 1],
+        "transactions": [120.0, 80.0],
+    })
+
+    calendar = store_calendar(
+        stores_df,
+        pd.Period("2017-01-01", freq="D"),
+        pd.Period("2017-01-08", freq="D"),
+        read_holidays(holidays_path),
+        transactions_df,
+    )
+    data = pd.DataFrame({
+        "date": pd.period_range("2017-01-01", "2017-01-08").repeat(2),
+        "store_nbr": ["1", "3"] * 8,
+    })
+    data = join_store_calendar(data, calendar).set_index(
+        ["date", "store_nbr"]
+    )
+
+    def days(col, store):
+        flagged = data.xs(store, level="store_nbr")[col]
+        return flagged[flagged > 0].index.strftime("%d").tolist()
+
+    assert days("national_holiday", "1") == ["02"]
+    assert days("national_holiday", "3") == ["02"]
+    assert days("regional_holiday", "1") == []
+    assert days("regional_holiday", "3") == ["03"]
+    assert days("local_holiday", "1") == ["04"]
+    assert days("local_holiday", "3") == ["06"]
+    assert days("is_event", "3") == ["07"]
+    assert days("is_work_day", "1") == ["08"]
+    assert days("transactions", "1") == ["04"]
+    assert days("transactions", "3") == ["02"]
@@ -0,0 +1,77 @@
+import numpy as np
+from omegaconf import OmegaConf
+from src.models.artifacts import save_series_artifact
+from src.models.tuning import _backtest_fold, candidate_columns, candidate_grid
+from tests.helpers import make_series
+
+
+def test_candidate_grid_samples_the_product():
+    cfg = OmegaConf.load("config/config.yaml").tune
+    search = cfg.search
+    size = (
+        len(search.target_lags)
+        * len(search.lags)
+        * len(search.windows)
+        * len(search.model_params)
+    )
+
+    candidates = candidate_grid(cfg)
+    assert len(candidates) == size
+    assert candidates[0]["target_lags"] == list(search.target_lags[0])
+
+    cfg.max_candidates = 3
+    sample = candidate_grid(cfg)
+    assert len(sample) == 3
+    assert sample == candidate_grid(cfg)
+    assert all(candidate in candidates for candidate in sample)
+
+
+def test_candidate_columns_keep_own_lags_and_windows():
+    columns = [
+        "onpromotion",
+        "sales_lag_29",
+        "sales_lag_35",
+        "sales_window_33_mean",
+        "sales_window_33_max",
+        "sales_window_40_mean",
+        "sales_window_40_max",
+        "sales__mean",
+    ]
+    candidate = {"target_lags": [-1], "lags": [7], "windows": [5]}
+
+    assert candidate_columns(candidate, columns, ["mean", "max"], 28) == [
+        "onpromotion",
+        "sales_lag_35",
+        "sales_window_33_mean",
+        "sales_window_33_max",
+        "sales__mean",
+    ]
+
+
+def test_backtest_fold_scores_the_next_horizon(tmp_path):
+    steps = np.arange(120)
+    y = [make_series(id, steps % 7 + id) for id in [0, 1, 2]]
+    future_cov = [
+        make_series(
+            id,
+            np.stack([steps % 5, steps % 7 + id], axis=1),
+            columns=("onpromotion", "sales_lag_7"),
+        )
+        for id in [0, 1, 2]
+    ]
+    save_series_artifact(y, tmp_path / "y")
+    save_series_artifact(future_cov, tmp_path / "future_cov")
+
+    candidate = {
+        "target_lags": [-1, -7],
+        "lags": [],
+        "windows": [],
+        "model_params": {"n_estimators": 20},
+    }
+    cutoff = y[0].time_index[-15]
+    error = _backtest_fold(
+        (tmp_path, candidate, ["onpromotion"], cutoff, 7, 1)
+    )
+
+    # A weekly pattern is learnt from the lag of one week
+    assert 0 <= error < 1